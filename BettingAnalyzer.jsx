@@ -21,10 +21,29 @@ import {
  * pip install flask requests beautifulsoup4 sqlite3
  */
 
+// Kaydedilebilecek bahisler (backend'deki settlement.MARKETS ile aynı kodlar)
+const MARKETS = [
+  { code: '1', label: '🏠 1' },
+  { code: 'X', label: '🤝 X' },
+  { code: '2', label: '✈️ 2' },
+  { code: 'over_2_5', label: '⚽ Üst 2.5' },
+  { code: 'under_2_5', label: '🛑 Alt 2.5' },
+  { code: 'btts', label: '🎯 KG Var' },
+];
+
+// Yerel saate göre bugünün tarihi (YYYY-MM-DD); toISOString UTC'dir, gece maçlarında bir gün geri kalır
+const localDate = () => {
+  const d = new Date();
+  d.setMinutes(d.getMinutes() - d.getTimezoneOffset());
+  return d.toISOString().slice(0, 10);
+};
+
 export default function BettingAnalyzerApp() {
   const [homeTeam, setHomeTeam] = useState('');
   const [awayTeam, setAwayTeam] = useState('');
   const [analysis, setAnalysis] = useState(null);
+  const [market, setMarket] = useState(null);
+  const [matchDate, setMatchDate] = useState(localDate());
   const [loading, setLoading] = useState(false);
   const [teams, setTeams] = useState([]);
   const [pastBets, setPastBets] = useState([]);
@@ -73,6 +92,11 @@ export default function BettingAnalyzerApp() {
       return;
     }
 
+    if (!market) {
+      Alert.alert('Hata', 'Bahsinizi seçin');
+      return;
+    }
+
     try {
       const response = await fetch(`${API_URL}/save-bet`, {
         method: 'POST',
@@ -84,6 +108,9 @@ export default function BettingAnalyzerApp() {
           away_team: awayTeam,
           analysis: analysis,
           date: new Date().toISOString(),
+          // Maç sonucu girildiğinde iddia bu bahis ve maç gününe göre otomatik sonuçlanır
+          market: market,
+          match_date: matchDate,
         }),
       });
 
@@ -93,6 +120,8 @@ export default function BettingAnalyzerApp() {
         setHomeTeam('');
         setAwayTeam('');
         setAnalysis(null);
+        setMarket(null);
+        setMatchDate(localDate());
       }
     } catch (error) {
       Alert.alert('Hata', `Kaydedilemedi: ${error.message}`);
@@ -227,6 +256,31 @@ export default function BettingAnalyzerApp() {
             </Text>
           </View>
 
+          {/* Bahis Seçimi */}
+          <Text style={styles.label}>Bahsiniz</Text>
+          <View style={styles.marketRow}>
+            {MARKETS.map((m) => (
+              <TouchableOpacity
+                key={m.code}
+                style={[styles.marketButton, market === m.code && styles.marketButtonActive]}
+                onPress={() => setMarket(m.code)}
+              >
+                <Text style={[styles.marketText, market === m.code && styles.marketTextActive]}>
+                  {m.label}
+                </Text>
+              </TouchableOpacity>
+            ))}
+          </View>
+
+          <Text style={styles.label}>Maç Tarihi</Text>
+          <TextInput
+            style={styles.input}
+            placeholder="YYYY-MM-DD"
+            value={matchDate}
+            onChangeText={setMatchDate}
+            placeholderTextColor="#aaa"
+          />
+
           {/* Kaydet Butonu */}
           <TouchableOpacity style={styles.saveButton} onPress={saveBet}>
             <Text style={styles.buttonText}>💾 İDDİAYI KAYDET</Text>
@@ -504,6 +558,32 @@ const styles = StyleSheet.create({
     alignItems: 'center',
     marginTop: 12,
   },
+  marketRow: {
+    flexDirection: 'row',
+    flexWrap: 'wrap',
+    marginBottom: 16,
+  },
+  marketButton: {
+    borderWidth: 1,
+    borderColor: '#ddd',
+    paddingVertical: 8,
+    paddingHorizontal: 12,
+    borderRadius: 8,
+    marginRight: 8,
+    marginBottom: 8,
+  },
+  marketButtonActive: {
+    backgroundColor: '#1e40af',
+    borderColor: '#1e40af',
+  },
+  marketText: {
+    fontSize: 13,
+    color: '#333',
+  },
+  marketTextActive: {
+    color: '#fff',
+    fontWeight: '600',
+  },
   betCard: {
     backgroundColor: '#fff',
     padding: 16,
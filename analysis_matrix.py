@@ -0,0 +1,138 @@
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from betting_analyzer import AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+class AnalysisMatrix:
+    """
+    Tüm (ev sahibi, deplasman) takım çiftleri için önceden hesaplanmış analizler
+    - build(): bilinen tüm takımlar için matrisi doldurur
+    - Bir takımın formu yenilenince sadece o takımın satırı ve sütunu yeniden hesaplanır
+    - get(): O(1) sözlük araması
+    - Çekimi başarısız takımların fallback formları matrise girmez, sonraki istekte tekrar denenir
+    - Sonuçlar AnalysisResult (sayısal çekirdek); metin/dict sadece gerektiğinde to_dict() ile üretilir
+    - local_only listener'lar sadece bu süreçte çekilen formların değişikliklerini alır
+      (başka worker'ın cache'e yazdığı formlar build() ile gelir, olayı o worker yayınlar)
+    """
+    
+    def __init__(self, api, analyzer, last_matches: int = 5):
+        self.api = api
+        self.analyzer = analyzer
+        self.last_matches = last_matches
+        
+        self.forms = {}     # team_id -> form
+        self.h2h = {}       # (home_id, away_id) -> h2h (statik)
+        self.results = {}   # (home_id, away_id) -> analiz
+        self.lock = threading.RLock()
+        self.listeners = []  # (callback(changes), local_only); changes: [(home_id, away_id, eski, yeni), ...]
+        self._state = threading.local()  # build() içinde mi (thread başına)
+        
+        # Form her yenilendiğinde ilgili satır/sütunu güncelle
+        api.add_listener(self.update_team)
+    
+    def build(self, team_ids: Optional[List[int]] = None) -> int:
+        """Matrisi kur; döner: hesaplanan çift sayısı"""
+        started = time.perf_counter()
+        team_ids = team_ids or list(self.api.team_id_map.keys())
+        
+        # Toplu çekim sırasında yeni formlar listener üzerinden zaten eklenir
+        # (build içinde sayılır: ilk kez hesaplanan çiftler local_only listener'lara gitmez)
+        self._state.building = True
+        try:
+            forms = self.api.get_team_forms(team_ids, self.last_matches)
+            
+            computed = 0
+            for team_id in team_ids:
+                if forms[team_id].get('fallback'):
+                    continue
+                # Listener'dan gelmeyen yeni form = başka worker'ın cache'e yazdığı form
+                if self.forms.get(team_id) is not forms[team_id]:
+                    computed += self.update_team(team_id, forms[team_id], local=False)
+        finally:
+            self._state.building = False
+        
+        elapsed = (time.perf_counter() - started) * 1000
+        logger.info(f"🧮 Analiz matrisi hazır: {len(self.results)} çift ({computed} yeniden hesaplandı), {elapsed:.1f} ms")
+        return computed
+    
+    def add_listener(self, callback: Callable[[List[Tuple[int, int, Optional[AnalysisResult], AnalysisResult]]], None],
+                     local_only: bool = False):
+        """
+        Satır/sütun yeniden hesaplandığında callback(changes) çağrılır
+        local_only=True: sadece bu süreçte çekilen formlar; build() sırasında eski değeri olmayan çiftler atlanır
+        """
+        self.listeners.append((callback, local_only))
+    
+    def update_team(self, team_id: int, form: Dict, local: bool = True) -> int:
+        """Takımın formunu güncelle ve satır + sütununu yeniden hesapla (local=False: form başka worker'dan)"""
+        changes = []
+        with self.lock:
+            self.forms[team_id] = form
+            
+            for other_id in self.forms:
+                if other_id == team_id:
+                    continue
+                for key in ((team_id, other_id), (other_id, team_id)):
+                    old = self.results.get(key)
+                    self.results[key] = self._analyze(*key)
+                    changes.append((key[0], key[1], old, self.results[key]))
+        
+        building = getattr(self._state, 'building', False)
+        for callback, local_only in self.listeners:
+            batch = changes
+            if local_only:
+                if not local:
+                    continue
+                if building:
+                    batch = [change for change in changes if change[2] is not None]
+                if not batch:
+                    continue
+            try:
+                callback(batch)
+            except Exception as e:
+                logger.error(f"Matris listener hatası: {e}")
+        
+        return len(changes)
+    
+    def _analyze(self, home_id: int, away_id: int, home_form: Optional[Dict] = None,
+                 away_form: Optional[Dict] = None) -> AnalysisResult:
+        key = (home_id, away_id)
+        if key not in self.h2h:
+            self.h2h[key] = self.api.get_head_to_head(home_id, away_id, self.last_matches)
+        return self.analyzer.compute(home_form or self.forms[home_id], away_form or self.forms[away_id], self.h2h[key])
+    
+    def get(self, home_id: int, away_id: int) -> Optional[AnalysisResult]:
+        return self.results.get((home_id, away_id))
+    
+    def get_or_compute(self, home_id: int, away_id: int) -> Tuple[AnalysisResult, Dict, Dict]:
+        """
+        Analizi matristen al; yoksa eksik takımların formunu çekip ekle. Döner: (analiz, ev formu, dep formu)
+        Fallback formla yapılan analiz döndürülür ama saklanmaz (sonraki istek çekimi tekrar dener)
+        """
+        key = (home_id, away_id)
+        analysis = self.results.get(key)
+        if analysis is not None:
+            return analysis, self.forms[home_id], self.forms[away_id]
+        
+        forms = {}
+        for team_id in key:
+            form = self.forms.get(team_id)
+            if form is None:
+                form = self.api.get_team_form(team_id, self.last_matches)
+                # Başarılı çekimde listener matrisi zaten günceller, cache'ten gelen formlar elle eklenir
+                if not form.get('fallback') and team_id not in self.forms:
+                    self.update_team(team_id, form)
+            forms[team_id] = form
+        
+        with self.lock:
+            analysis = self.results.get(key)
+            if analysis is None:
+                analysis = self._analyze(home_id, away_id, forms[home_id], forms[away_id])
+                if not any(form.get('fallback') for form in forms.values()):
+                    self.results[key] = analysis
+        
+        return analysis, forms[home_id], forms[away_id]
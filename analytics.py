@@ -0,0 +1,208 @@
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from betting_analyzer import AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+# Kırılımlar: 'all' tek grup, diğerleri bets kolonlarından
+DIMENSIONS = ('all', 'team', 'market', 'risk', 'calibration')
+
+# Sonuçlanmış iddia satırı (aggregate'ler için gereken kolonlar)
+BET_COLUMNS = 'id, home_team, away_team, market, risk_level, date, stake, odds, predicted_prob, result'
+
+# Market -> AnalysisResult alanı (modelin o market için olasılığı)
+MARKET_ATTRS = {
+    '1': 'home_win_prob',
+    'X': 'draw_prob',
+    '2': 'away_win_prob',
+    'over_2_5': 'over_2_5',
+    'under_2_5': 'under_2_5',
+    'btts': 'btts',
+}
+
+
+def bet_features(data: Dict, market: Optional[str], result: Optional[AnalysisResult] = None) -> Tuple[float, Optional[float], Optional[float], Optional[str]]:
+    """
+    İddia kaydedilirken bir kez çıkarılan analitik alanlar
+    - predicted_prob: istekte verilmişse o, yoksa kayıt anında matristeki analizden (result: AnalysisResult)
+      İstemcinin gönderdiği analiz gövdesinden okunmaz (eski /analyze yanıtı sabit değerler taşıyordu)
+    Döner: (stake, odds, predicted_prob, risk_level)
+    """
+    analysis = data.get('analysis')
+    if isinstance(analysis, str):
+        try:
+            analysis = json.loads(analysis)
+        except ValueError:
+            analysis = None
+    if not isinstance(analysis, dict):
+        analysis = {}
+    
+    try:
+        stake = float(data.get('stake') or 1)
+    except (TypeError, ValueError):
+        stake = 1.0
+    
+    try:
+        odds = float(data['odds']) if data.get('odds') else None
+    except (TypeError, ValueError):
+        odds = None
+    
+    prob = data.get('predicted_prob')
+    if prob is None and result is not None and market in MARKET_ATTRS:
+        prob = getattr(result, MARKET_ATTRS[market])
+    if not isinstance(prob, (int, float)):
+        prob = None
+    
+    if result is not None:
+        risk_level = result.risk_level
+    else:
+        risk_level = analysis.get('risk_level') or analysis.get('risk')
+    
+    return stake, odds, prob, risk_level
+
+
+def _group_keys(bet: Dict) -> List[Tuple[str, str]]:
+    """Bir iddianın katkı yaptığı (dimension, key) grupları"""
+    keys = [('all', ''), ('team', bet['home_team']), ('market', bet['market'] or '?'), ('risk', bet['risk_level'] or '?')]
+    if bet['away_team'] != bet['home_team']:
+        keys.append(('team', bet['away_team']))
+    if bet['predicted_prob'] is not None:
+        # %10'luk olasılık dilimleri (0.0, 0.1, ... 0.9)
+        keys.append(('calibration', f"{min(int(bet['predicted_prob'] * 10), 9) / 10:.1f}"))
+    return keys
+
+
+def apply(conn, bets: Iterable[Dict], sign: int = 1):
+    """
+    Sonuçlanmış iddiaları aggregate'lere ekle (sign=1) veya çıkar (sign=-1)
+    Sadece 'win' / 'loss' sayılır; toplamlar toplanabilir olduğu için düzeltmeler birebir geri alınır
+    """
+    rows = {}
+    for bet in bets:
+        if bet['result'] not in ('win', 'loss'):
+            continue
+        
+        won = bet['result'] == 'win'
+        stake = bet['stake'] or 1.0
+        odds = bet['odds']
+        prob = bet['predicted_prob']
+        period = (bet['date'] or '')[:7]
+        
+        # Oranı bilinmeyen iddialar ROI'ye girmez
+        roi_stake = stake if odds else 0.0
+        profit = (stake * (odds - 1) if won else -stake) if odds else 0.0
+        
+        for dimension, key in _group_keys(bet):
+            acc = rows.setdefault((dimension, key, period), [0, 0, 0.0, 0.0, 0.0, 0, 0])
+            acc[0] += 1
+            acc[1] += won
+            acc[2] += roi_stake
+            acc[3] += profit
+            acc[4] += prob or 0.0
+            acc[5] += prob is not None
+            acc[6] += prob is not None and won
+    
+    conn.executemany('''
+        INSERT INTO bet_aggregates (dimension, key, period, bets, wins, stake, profit, prob_sum, prob_count, prob_wins)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (dimension, key, period) DO UPDATE SET
+            bets = bets + excluded.bets,
+            wins = wins + excluded.wins,
+            stake = stake + excluded.stake,
+            profit = profit + excluded.profit,
+            prob_sum = prob_sum + excluded.prob_sum,
+            prob_count = prob_count + excluded.prob_count,
+            prob_wins = prob_wins + excluded.prob_wins
+    ''', [
+        (dimension, key, period, *(sign * v for v in acc))
+        for (dimension, key, period), acc in rows.items()
+    ])
+
+
+def fetch_bets(conn, where: str, params: tuple = ()) -> List[Dict]:
+    cursor = conn.execute(f'SELECT {BET_COLUMNS} FROM bets WHERE {where}', params)
+    names = [d[0] for d in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def rebuild(conn):
+    """Aggregate'leri tüm sonuçlanmış iddialardan baştan hesapla"""
+    conn.execute('DELETE FROM bet_aggregates')
+    apply(conn, fetch_bets(conn, "result IN ('win', 'loss')"))
+
+
+def query(conn, by: str = 'all', months: int = 0, rolling: int = 3) -> List[Dict]:
+    """
+    Kırılım bazında ROI, win rate, drawdown ve kalibrasyon
+    - months: sadece son N ay (0 = tümü)
+    - rolling: son N ayın win rate'i
+    Drawdown aylık kümülatif kâr serisi üzerinden hesaplanır
+    Kalibrasyon farkı sadece olasılığı bilinen iddialar üzerinden: prob_wins / prob_count - ortalama olasılık
+    """
+    sql = '''
+        SELECT key, period, bets, wins, stake, profit, prob_sum, prob_count, prob_wins
+        FROM bet_aggregates
+        WHERE dimension = ? AND bets > 0
+    '''
+    params = [by]
+    if months:
+        sql += " AND period >= strftime('%Y-%m', 'now', ?)"
+        params.append(f'-{months - 1} months')
+    sql += ' ORDER BY key, period'
+    
+    groups = {}
+    for key, period, bets, wins, stake, profit, prob_sum, prob_count, prob_wins in conn.execute(sql, params):
+        groups.setdefault(key, []).append({
+            'period': period, 'bets': bets, 'wins': wins, 'stake': stake,
+            'profit': profit, 'prob_sum': prob_sum, 'prob_count': prob_count, 'prob_wins': prob_wins,
+        })
+    
+    result = []
+    for key, series in groups.items():
+        bets = sum(p['bets'] for p in series)
+        wins = sum(p['wins'] for p in series)
+        stake = sum(p['stake'] for p in series)
+        profit = sum(p['profit'] for p in series)
+        prob_count = sum(p['prob_count'] for p in series)
+        avg_predicted = sum(p['prob_sum'] for p in series) / prob_count if prob_count else None
+        # Gerçekleşen sıklık, ortalama olasılıkla aynı iddialar üzerinden (olasılığı bilinmeyenler hariç)
+        realised = sum(p['prob_wins'] for p in series) / prob_count if prob_count else None
+        
+        recent = series[-rolling:] if rolling else series
+        recent_bets = sum(p['bets'] for p in recent)
+        
+        # Maksimum düşüş: kümülatif kârın önceki zirveden en büyük geri çekilmesi
+        cumulative = peak = max_drawdown = 0.0
+        for p in series:
+            cumulative += p['profit']
+            peak = max(peak, cumulative)
+            max_drawdown = max(max_drawdown, peak - cumulative)
+        
+        win_rate = wins / bets
+        result.append({
+            'key': key,
+            'bets': bets,
+            'wins': wins,
+            'losses': bets - wins,
+            'win_rate': round(win_rate, 4),
+            'rolling_win_rate': round(sum(p['wins'] for p in recent) / recent_bets, 4) if recent_bets else None,
+            'stake': round(stake, 2),
+            'profit': round(profit, 2),
+            'roi': round(profit / stake, 4) if stake else None,
+            'max_drawdown': round(max_drawdown, 2),
+            'avg_predicted': round(avg_predicted, 4) if avg_predicted is not None else None,
+            'calibration_gap': round(realised - avg_predicted, 4) if avg_predicted is not None else None,
+            'series': [
+                {'period': p['period'], 'bets': p['bets'], 'wins': p['wins'], 'profit': round(p['profit'], 2)}
+                for p in series
+            ],
+        })
+    
+    # Kalibrasyon dilimleri olasılık sırasıyla, diğerleri iddia sayısına göre
+    if by == 'calibration':
+        result.sort(key=lambda g: g['key'])
+    else:
+        result.sort(key=lambda g: g['bets'], reverse=True)
+    return result
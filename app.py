@@ -1,16 +1,32 @@
+if __name__ == '__main__':
+    # /stream aboneleri thread değil greenlet olsun diye diğer importlardan önce yamalanır
+    from gevent import monkey
+    monkey.patch_all()
+
 import os
 from os.path import join, dirname
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import sqlite3
 import json
 from datetime import datetime
+from functools import lru_cache
 from sofascore_api import FootballDataAPI
 from betting_analyzer import BettingAnalyzer
+from analysis_matrix import AnalysisMatrix
+from fixtures import MatchdayPipeline
+from events import EventBroker, analysis_diff
+from settlement import bet_market, settle_pending_bets
+import analytics
+from value_bets import ValueBetScanner, load_odds_file
+from form_cache import SharedFormCache
+from responses import COMPACT_FIELDS, compact_analysis, parse_fields
+import responses
 import logging
 
 app = Flask(__name__)
 CORS(app)
+responses.init_app(app)
 
 # Logging
 logging.basicConfig(level=logging.INFO)
@@ -19,6 +35,42 @@ logger = logging.getLogger(__name__)
 # Initialize modules
 api = FootballDataAPI()
 analyzer = BettingAnalyzer()
+matrix = AnalysisMatrix(api, analyzer)
+pipeline = MatchdayPipeline(api, matrix, interval=int(os.environ.get('FIXTURES_REFRESH_SECONDS', 900)))
+broker = EventBroker()
+scanner = ValueBetScanner(api, matrix)
+
+
+def _publish_form(team_id, form):
+    broker.publish('form', {
+        'team_id': team_id,
+        'form': ''.join(form.get('form', [])),
+        'w': form.get('wins'),
+        'd': form.get('draws'),
+        'l': form.get('losses'),
+    })
+
+
+def _publish_analysis(changes):
+    pairs = []
+    for home_id, away_id, old, new in changes:
+        diff = analysis_diff(old, new)
+        if diff:
+            pairs.append({'h': home_id, 'a': away_id, **diff})
+    if pairs:
+        broker.publish('analysis', {'pairs': pairs})
+
+
+def _publish_bets(results):
+    """İddia sonucu değişiklikleri (otomatik ve elle): event 'bets', data {"results": [[id, sonuç], ...]}"""
+    if results:
+        broker.publish('bets', {'results': [[bet_id, result] for bet_id, result in results]})
+
+
+# Canlı güncellemeleri SSE abonelerine yayınla
+api.add_listener(_publish_form)
+# Analiz olayını sadece formu çeken worker yayınlar (diğerleri aynı değişikliği build() ile alır)
+matrix.add_listener(_publish_analysis, local_only=True)
 
 # Cloud'da çalışmak için database yolu
 if os.environ.get('RENDER'):
@@ -27,9 +79,14 @@ else:
     DB_PATH = 'betting_data.db'  # Local
 
 def init_db():
-    """SQLite veritabanını başlat"""
-    conn = sqlite3.connect(DB_PATH)
+    """
+    SQLite veritabanını başlat
+    Her worker çağırır: şema ve migration'lar tek yazma transaction'ında (BEGIN IMMEDIATE) yapılır,
+    kolon kontrolleri kilit alındıktan sonra okunduğu için iki worker aynı kolonu eklemeye çalışmaz
+    """
+    conn = sqlite3.connect(DB_PATH, timeout=30)
     c = conn.cursor()
+    c.execute('BEGIN IMMEDIATE')
     
     c.execute('''
         CREATE TABLE IF NOT EXISTS bets (
@@ -43,6 +100,84 @@ def init_db():
         )
     ''')
     
+    # Eski veritabanlarına market ve maç günü kolonlarını ekle
+    # Mevcut iddialar NULL kalır: marketleri ve maç günleri bilinmediği için otomatik sonuçlanmazlar
+    columns = [row[1] for row in c.execute('PRAGMA table_info(bets)')]
+    if 'market' not in columns:
+        c.execute('ALTER TABLE bets ADD COLUMN market TEXT')
+    if 'match_date' not in columns:
+        c.execute('ALTER TABLE bets ADD COLUMN match_date TEXT')
+    
+    # Analitik kolonları: analysis JSON'u her sorguda tekrar parse edilmesin diye kayıtta bir kez çıkarılır
+    # Eski iddiaların predicted_prob'u NULL kalır (kayıtlı analizlerdeki olasılıklar sabit değerlerdi)
+    if 'predicted_prob' not in columns:
+        c.execute('ALTER TABLE bets ADD COLUMN stake REAL NOT NULL DEFAULT 1')
+        c.execute('ALTER TABLE bets ADD COLUMN odds REAL')
+        c.execute('ALTER TABLE bets ADD COLUMN predicted_prob REAL')
+        c.execute('ALTER TABLE bets ADD COLUMN risk_level TEXT')
+        rows = c.execute('SELECT id, analysis, market FROM bets').fetchall()
+        c.executemany(
+            'UPDATE bets SET stake = ?, odds = ?, predicted_prob = ?, risk_level = ? WHERE id = ?',
+            [analytics.bet_features({'analysis': analysis}, market) + (bet_id,) for bet_id, analysis, market in rows]
+        )
+    
+    # Sonuçlanmış iddiaların artımlı toplamları (dimension: all/team/market/risk/calibration, period: YYYY-MM)
+    has_aggregates = c.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bet_aggregates'"
+    ).fetchone()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS bet_aggregates (
+            dimension TEXT NOT NULL,
+            key TEXT NOT NULL,
+            period TEXT NOT NULL,
+            bets INTEGER NOT NULL,
+            wins INTEGER NOT NULL,
+            stake REAL NOT NULL,
+            profit REAL NOT NULL,
+            prob_sum REAL NOT NULL,
+            prob_count INTEGER NOT NULL,
+            prob_wins INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, key, period)
+        )
+    ''')
+    # prob_wins: olasılığı bilinen iddiaların kazananları (kalibrasyon aynı popülasyon üzerinden hesaplanır)
+    aggregate_columns = [row[1] for row in c.execute('PRAGMA table_info(bet_aggregates)')]
+    if 'prob_wins' not in aggregate_columns:
+        c.execute('ALTER TABLE bet_aggregates ADD COLUMN prob_wins INTEGER NOT NULL DEFAULT 0')
+    if not has_aggregates or 'prob_wins' not in aggregate_columns:
+        analytics.rebuild(conn)
+    
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_bets_pending
+        ON bets (home_team, away_team)
+        WHERE result IS NULL OR result = 'pending'
+    ''')
+    
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            home_team TEXT NOT NULL,
+            away_team TEXT NOT NULL,
+            date TEXT NOT NULL,
+            home_goals INTEGER NOT NULL,
+            away_goals INTEGER NOT NULL,
+            UNIQUE (home_team, away_team, date)
+        )
+    ''')
+    
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS odds (
+            home_team TEXT NOT NULL,
+            away_team TEXT NOT NULL,
+            date TEXT NOT NULL,
+            market TEXT NOT NULL,
+            bookmaker TEXT NOT NULL,
+            odds REAL NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (home_team, away_team, date, market, bookmaker)
+        )
+    ''')
+    
     c.execute('''
         CREATE TABLE IF NOT EXISTS teams_cache (
             team_id INTEGER PRIMARY KEY,
@@ -55,6 +190,43 @@ def init_db():
     conn.commit()
     conn.close()
 
+@lru_cache(maxsize=1024)
+def _find_team(name):
+    return api.search_team(name)
+
+
+def _canonical_team(name):
+    """Bilinen takımlar için kayıtlı adı kullan (sonuç eşleştirmesi için)"""
+    team = _find_team(name)
+    return team['name'] if team else name.strip()
+
+
+def _match_date(data, home_team, away_team):
+    """Maçın günü: istekte verilmişse o, yoksa günün fikstüründen; bilinmiyorsa None"""
+    match_date = data.get('match_date')
+    if match_date:
+        return str(match_date)[:10]
+    return pipeline.match_date(home_team, away_team)
+
+
+def _bet_row(data):
+    market = bet_market(data)
+    home_team = _canonical_team(data['home_team'])
+    away_team = _canonical_team(data['away_team'])
+    
+    # Modelin olasılığı ve risk seviyesi kayıt anında matristen alınır (istemcinin gönderdiği analizden değil)
+    home, away = _find_team(data['home_team']), _find_team(data['away_team'])
+    result = matrix.get(home['id'], away['id']) if home and away else None
+    
+    return (
+        home_team,
+        away_team,
+        json.dumps(data['analysis']),
+        data['date'],
+        _match_date(data, home_team, away_team),
+        market
+    ) + analytics.bet_features(data, market, result)
+
 # API Endpoints
 
 @app.route('/analyze', methods=['POST'])
@@ -62,6 +234,7 @@ def analyze():
     """
     Maç analizi yap
     İstek: { "home_team": "Fenerbahçe", "away_team": "Galatasaray" }
+    Kompakt yanıt: /analyze?v=2&fields=probs,goals,form,h2h,rec,assessment
     """
     try:
         data = request.json
@@ -83,28 +256,24 @@ def analyze():
         home_team_id = home_team_data['id']
         away_team_id = away_team_data['id']
         
-        # Form verilerini al
-        home_form = api.get_team_form(home_team_id, 5)
-        away_form = api.get_team_form(away_team_id, 5)
+        # Önceden hesaplanmış matristen al (yoksa hesaplanıp eklenir)
+        result, home_form, away_form = matrix.get_or_compute(home_team_id, away_team_id)
         
-        # H2H al
-        h2h = api.get_head_to_head(home_team_id, away_team_id, 5)
+        if request.args.get('v', type=int) == 2:
+            try:
+                fields = parse_fields(request.args.get('fields'))
+            except ValueError as e:
+                return jsonify({'error': f"{e}; fields şunlardan olmalı: {', '.join(COMPACT_FIELDS)}"}), 400
+            
+            return jsonify(compact_analysis(result, home_team_name, away_team_name, fields))
         
-        # Analiz yap
-        analysis = analyzer.analyze_match(home_form, away_form, h2h)
+        analysis = result.to_dict()
+        logger.debug("Analysis result: %s", analysis)
         
-        # Analiz yap
-        analysis = analyzer.analyze_match(home_form, away_form, h2h)
-        
-        logger.info(f"Analysis result: {analysis}")
-        
-        # Response oluştur - Güvenli erişim
-        try:
-            home_win = analysis.get('win_probabilities', {}).get('home', 0.48)
-            draw = analysis.get('win_probabilities', {}).get('draw', 0.25)
-            away_win = analysis.get('win_probabilities', {}).get('away', 0.27)
-        except:
-            home_win, draw, away_win = 0.48, 0.25, 0.27
+        # Response oluştur (olasılıklar analizden; eskiden olmayan bir anahtardan okunup sabit değerlere düşüyordu)
+        home_win = analysis['home_win_prob']
+        draw = analysis['draw_prob']
+        away_win = analysis['away_win_prob']
         
         response = {
             'success': True,
@@ -145,6 +314,9 @@ def analyze():
 def save_bet():
     """
     Yapılan iddiaları kaydet
+    İstek: { "home_team", "away_team", "analysis", "date", "match_date"?: "YYYY-MM-DD", "market"?, "stake"?, "odds"? }
+    date: iddianın verildiği zaman; match_date: maçın günü (verilmezse günün fikstüründen bulunur)
+    Sadece market ve maç günü bilinen iddialar sonuçlar girildiğinde otomatik sonuçlanır
     """
     try:
         data = request.json
@@ -153,14 +325,9 @@ def save_bet():
         c = conn.cursor()
         
         c.execute('''
-            INSERT INTO bets (home_team, away_team, analysis, date)
-            VALUES (?, ?, ?, ?)
-        ''', (
-            data['home_team'],
-            data['away_team'],
-            json.dumps(data['analysis']),
-            data['date']
-        ))
+            INSERT INTO bets (home_team, away_team, analysis, date, match_date, market, stake, odds, predicted_prob, risk_level)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', _bet_row(data))
         
         conn.commit()
         bet_id = c.lastrowid
@@ -174,6 +341,44 @@ def save_bet():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/bets/bulk', methods=['POST'])
+def save_bets_bulk():
+    """
+    Birden fazla iddiayı tek transaction'da kaydet
+    İstek: { "bets": [{ "home_team", "away_team", "analysis", "date", "match_date"?, "market"?, "stake"?, "odds"? }, ...] }
+    """
+    try:
+        data = request.json
+        bets = data.get('bets', []) if isinstance(data, dict) else data
+        
+        if not isinstance(bets, list) or not bets:
+            return jsonify({'error': 'İddia listesi gerekli'}), 400
+        
+        for i, bet in enumerate(bets):
+            if not isinstance(bet, dict):
+                return jsonify({'error': f"{i}. iddia bir nesne olmalı"}), 400
+            missing = [f for f in ('home_team', 'away_team', 'analysis', 'date') if f not in bet]
+            if missing:
+                return jsonify({'error': f"{i}. iddiada eksik alan: {', '.join(missing)}"}), 400
+        
+        rows = [_bet_row(bet) for bet in bets]
+        
+        conn = sqlite3.connect(DB_PATH)
+        with conn:
+            conn.executemany('''
+                INSERT INTO bets (home_team, away_team, analysis, date, match_date, market, stake, odds, predicted_prob, risk_level)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+        conn.close()
+        
+        logger.info(f"Bulk bets saved: {len(rows)}")
+        return jsonify({'success': True, 'count': len(rows)})
+    
+    except Exception as e:
+        logger.error(f"Bulk bet save error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/bets', methods=['GET'])
 def get_bets():
     """
@@ -239,18 +444,25 @@ def update_bet_result(bet_id):
         data = request.json
         
         conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        
-        c.execute('''
-            UPDATE bets 
-            SET result = ?, notes = ?
-            WHERE id = ?
-        ''', (data.get('result'), data.get('notes'), bet_id))
-        
-        conn.commit()
+        with conn:
+            # Yazma kilidi okumadan önce alınır: araya başka worker'ın sonuçlandırması girip çift sayım olmasın
+            conn.execute('BEGIN IMMEDIATE')
+            
+            # Eski sonucun katkısını geri al, yenisini ekle
+            old = analytics.fetch_bets(conn, 'id = ?', (bet_id,))
+            
+            conn.execute('''
+                UPDATE bets 
+                SET result = ?, notes = ?
+                WHERE id = ?
+            ''', (data.get('result'), data.get('notes'), bet_id))
+            
+            analytics.apply(conn, old, sign=-1)
+            analytics.apply(conn, analytics.fetch_bets(conn, 'id = ?', (bet_id,)))
         conn.close()
         
         logger.info(f"Bet {bet_id} result updated: {data.get('result')}")
+        _publish_bets([(bet_id, data.get('result'))])
         return jsonify({'success': True})
     
     except Exception as e:
@@ -258,6 +470,154 @@ def update_bet_result(bet_id):
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/results', methods=['POST'])
+def ingest_results():
+    """
+    Maç sonuçlarını toplu kaydet ve bekleyen iddiaları otomatik sonuçlandır
+    İstek: { "results": [{ "home_team", "away_team", "date": "YYYY-MM-DD", "home_goals", "away_goals" }, ...] }
+    """
+    try:
+        data = request.json
+        results = data.get('results', []) if isinstance(data, dict) else data
+        
+        if not isinstance(results, list) or not results:
+            return jsonify({'error': 'Sonuç listesi gerekli'}), 400
+        
+        try:
+            rows = [(
+                _canonical_team(r['home_team']),
+                _canonical_team(r['away_team']),
+                r['date'][:10],
+                int(r['home_goals']),
+                int(r['away_goals'])
+            ) for r in results]
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({'error': f'Geçersiz sonuç: {e}'}), 400
+        
+        conn = sqlite3.connect(DB_PATH)
+        with conn:
+            conn.executemany('''
+                INSERT INTO results (home_team, away_team, date, home_goals, away_goals)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (home_team, away_team, date)
+                DO UPDATE SET home_goals = excluded.home_goals, away_goals = excluded.away_goals
+            ''', rows)
+            settled = settle_pending_bets(conn)
+        conn.close()
+        
+        _publish_bets([(bet['id'], bet['result']) for bet in settled])
+        return jsonify({'success': True, 'results': len(rows), 'settled': len(settled)})
+    
+    except Exception as e:
+        logger.error(f"Results ingest error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/bets/settle', methods=['POST'])
+def settle_bets():
+    """
+    Bekleyen iddiaları kayıtlı sonuçlara göre sonuçlandır
+    """
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        with conn:
+            settled = settle_pending_bets(conn)
+        conn.close()
+        
+        _publish_bets([(bet['id'], bet['result']) for bet in settled])
+        return jsonify({'success': True, 'settled': len(settled)})
+    
+    except Exception as e:
+        logger.error(f"Settle error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+def save_odds(odds_rows):
+    """Oranları tarayıcıya ekle ve veritabanına yaz"""
+    rows, skipped = scanner.ingest(odds_rows)
+    now = datetime.now().isoformat()
+    
+    conn = sqlite3.connect(DB_PATH)
+    with conn:
+        conn.executemany('''
+            INSERT INTO odds (home_team, away_team, date, market, bookmaker, odds, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (home_team, away_team, date, market, bookmaker)
+            DO UPDATE SET odds = excluded.odds, updated_at = excluded.updated_at
+        ''', [row + (now,) for row in rows])
+    conn.close()
+    
+    return len(rows), skipped
+
+
+def load_odds():
+    """Kayıtlı oranları (günü geçmemiş olanlar) ve ODDS_FILE'ı (varsa) tarayıcıya yükle"""
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    rows = [dict(row) for row in conn.execute('''
+        SELECT * FROM odds
+        WHERE date = '' OR date >= date('now', 'localtime')
+        ORDER BY updated_at
+    ''')]
+    conn.close()
+    scanner.ingest(rows)
+    
+    odds_file = os.environ.get('ODDS_FILE')
+    if odds_file:
+        saved, skipped = save_odds(load_odds_file(odds_file))
+        logger.info(f"Odds file imported: {saved} lines, {skipped} skipped")
+
+
+@app.route('/odds', methods=['POST'])
+def ingest_odds():
+    """
+    Bahis oranlarını toplu kaydet
+    İstek: { "odds": [{ "home_team", "away_team", "market": "1/X/2/over_2_5/under_2_5/btts", "odds", "date"?, "bookmaker"? }, ...] }
+    """
+    try:
+        data = request.json
+        odds_rows = data.get('odds', []) if isinstance(data, dict) else data
+        
+        if not isinstance(odds_rows, list) or not odds_rows:
+            return jsonify({'error': 'Oran listesi gerekli'}), 400
+        
+        saved, skipped = save_odds(odds_rows)
+        return jsonify({'success': True, 'saved': saved, 'skipped': skipped})
+    
+    except Exception as e:
+        logger.error(f"Odds ingest error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/value-bets', methods=['GET'])
+def get_value_bets():
+    """
+    Model olasılığı oranların ima ettiğinden yüksek olan bahisler (edge'e göre sıralı)
+    Parametreler: limit (varsayılan 20), market, min_edge
+    """
+    try:
+        limit = request.args.get('limit', 20, type=int)
+        if limit < 1:
+            return jsonify({'error': 'limit pozitif bir sayı olmalı'}), 400
+        
+        market = request.args.get('market')
+        min_edge = request.args.get('min_edge', 0.0, type=float)
+        
+        bets = scanner.top(limit, market, min_edge)
+        
+        return jsonify({
+            'success': True,
+            'value_bets': bets,
+            'count': len(bets),
+            'lines': scanner.count_lines(),
+            'updated_at': scanner.updated_at
+        })
+    
+    except Exception as e:
+        logger.error(f"Value bets error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/stats', methods=['GET'])
 def get_stats():
     """
@@ -298,6 +658,70 @@ def get_stats():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """
+    Form cache istatistikleri (tüm worker'lar toplamı)
+    """
+    try:
+        if isinstance(api.cache, SharedFormCache):
+            return jsonify({'shared': True, **api.cache.stats()})
+        
+        return jsonify({'shared': False, 'entries': len(api.cache)})
+    
+    except Exception as e:
+        logger.error(f"Cache stats error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/stream', methods=['GET'])
+def stream():
+    """
+    Canlı güncellemeler (server-sent events)
+    Olaylar:
+    - form: {"team_id", "form", "w", "d", "l"}
+    - analysis: {"pairs": [{"h", "a", ...sadece değişen olasılıklar}]}
+    - bets: {"results": [[iddia id, "win/loss/pending"], ...]} (otomatik sonuçlandırma ve elle güncelleme)
+    """
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    
+    return Response(
+        stream_with_context(broker.stream(last_event_id)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
+@app.route('/stats/analytics', methods=['GET'])
+def get_analytics():
+    """
+    ROI, win rate, drawdown ve kalibrasyon analizi
+    Parametreler: by (all/team/market/risk/calibration), months (son N ay, 0 = tümü), rolling (N ay)
+    """
+    try:
+        by = request.args.get('by', 'all')
+        if by not in analytics.DIMENSIONS:
+            return jsonify({'error': f"by şunlardan biri olmalı: {', '.join(analytics.DIMENSIONS)}"}), 400
+        
+        months = request.args.get('months', 0, type=int)
+        rolling = request.args.get('rolling', 3, type=int)
+        if months < 0 or rolling < 0:
+            return jsonify({'error': 'months ve rolling negatif olamaz'}), 400
+        
+        conn = sqlite3.connect(DB_PATH)
+        groups = analytics.query(conn, by, months, rolling)
+        conn.close()
+        
+        return jsonify({'success': True, 'by': by, 'groups': groups})
+    
+    except Exception as e:
+        logger.error(f"Analytics error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/teams/search', methods=['GET'])
 def search_teams():
     """
@@ -339,14 +763,16 @@ def health():
 def get_todays_matches():
     """
     Bugünün maçlarını getir (Süper Lig ve Avrupa)
+    Olasılıklar önceden hesaplanmış olarak bellekten döner
     """
     try:
-        matches = api.get_todays_matches()
+        matches = pipeline.matches
         
         return jsonify({
             'success': True,
             'matches': matches,
-            'count': len(matches)
+            'count': len(matches),
+            'updated_at': pipeline.updated_at
         })
     
     except Exception as e:
@@ -366,17 +792,42 @@ def server_error(error):
     return jsonify({'error': 'Sunucu hatası'}), 500
 
 
-if __name__ == '__main__':
+def create_app():
+    """
+    Uygulama fabrikası (production: gunicorn -c gunicorn.conf.py)
+    Her worker kendi içinde çağırır; form cache'i tüm worker'lar SQLite üzerinden paylaşır
+    """
     # Veritabanını başlat
     init_db()
     
+    # /stream olaylarını tüm worker'lara dağıt
+    broker.share(DB_PATH)
+    
+    # Form cache'ini worker'lar arasında paylaş (FORM_CACHE_TTL saniye sonra yeniden çekilir)
+    ttl = int(os.environ.get('FORM_CACHE_TTL', 900))
+    api.cache = SharedFormCache(DB_PATH, ttl=ttl)
+    pipeline.force_refresh = not ttl
+    
+    # Tüm takım çiftlerini önceden analiz et
+    matrix.build()
+    
+    # Kayıtlı oranları yükle ve value bet'leri tara
+    load_odds()
+    
+    # Günün maçlarını önceden analiz et ve periyodik yenile
+    pipeline.start()
+    
+    return app
+
+
+if __name__ == '__main__':
+    create_app()
+    
+    from gevent.pywsgi import WSGIServer
+    
     # Port'u environment variable'dan al
     port = int(os.environ.get('PORT', 5000))
     
-    # Sunucuyu başlat
-    app.run(
-        host='0.0.0.0',
-        port=port,
-        debug=False,
-        use_reloader=False
-    )
+    # Sunucuyu başlat (gevent: her bağlantı bir greenlet, boşta SSE aboneleri thread tutmaz)
+    logger.info(f"🚀 Sunucu başlatılıyor: 0.0.0.0:{port}")
+    WSGIServer(('0.0.0.0', port), app).serve_forever()
@@ -1,13 +1,86 @@
 import math
 from typing import Dict, List
 
-class BettingAnalyzer:
-    """Basit ve etkili analiz motoru"""
+class AnalysisResult:
+    """
+    Analizin sayısal çekirdeği
+    - Sadece olasılıklar ve ortalamalar tutulur (__slots__, dict yok)
+    - Tavsiye metinleri, etiketler ve eski dict şekli sadece istendiğinde üretilir
+    """
     
-    def analyze_match(self, home_form: Dict, away_form: Dict, h2h: Dict) -> Dict:
-        """Maç analizi"""
+    __slots__ = (
+        'home_form', 'away_form',
+        'home_win_prob', 'draw_prob', 'away_win_prob', 'max_prob',
+        'over_2_5', 'over_1_5', 'btts',
+        'home_gf_avg', 'away_gf_avg', 'home_ga_avg', 'away_ga_avg',
+        'home_form_score', 'away_form_score',
+        'h2h_home_wins', 'h2h_away_wins', 'h2h_draws',
+        '_dict',
+    )
+    
+    def __init__(self, home_form: Dict, away_form: Dict, home_win_prob: float, draw_prob: float, away_win_prob: float,
+                 over_2_5: float, over_1_5: float, btts: float,
+                 home_gf_avg: float, away_gf_avg: float, home_ga_avg: float, away_ga_avg: float,
+                 home_form_score: float, away_form_score: float,
+                 h2h_home_wins: int, h2h_away_wins: int, h2h_draws: int):
+        self.home_form = home_form
+        self.away_form = away_form
+        self.home_win_prob = home_win_prob
+        self.draw_prob = draw_prob
+        self.away_win_prob = away_win_prob
+        self.max_prob = max(home_win_prob, away_win_prob, draw_prob)
+        self.over_2_5 = over_2_5
+        self.over_1_5 = over_1_5
+        self.btts = btts
+        self.home_gf_avg = home_gf_avg
+        self.away_gf_avg = away_gf_avg
+        self.home_ga_avg = home_ga_avg
+        self.away_ga_avg = away_ga_avg
+        self.home_form_score = home_form_score
+        self.away_form_score = away_form_score
+        self.h2h_home_wins = h2h_home_wins
+        self.h2h_away_wins = h2h_away_wins
+        self.h2h_draws = h2h_draws
+        self._dict = None
+    
+    @property
+    def under_2_5(self) -> float:
+        return 1 - self.over_2_5
+    
+    @property
+    def expected_total(self) -> float:
+        return self.home_gf_avg + self.away_gf_avg
+    
+    @property
+    def risk_level(self) -> str:
+        return 'LOW' if self.max_prob > 0.65 else 'MEDIUM' if self.max_prob > 0.50 else 'HIGH'
+    
+    @property
+    def recommendation(self) -> str:
+        if self.home_win_prob > 0.55:
+            return f"🏠 EV SAHİBİ FAVORIT: {int(self.home_win_prob*100)}%"
+        elif self.away_win_prob > 0.55:
+            return f"✈️ DEPLASMAN GÜÇLÜ: {int(self.away_win_prob*100)}%"
+        else:
+            return f"🤝 YAKIN MAÇLAR: Her şey mümkün"
+    
+    @property
+    def goal_recommendation(self) -> str:
+        if self.over_2_5 > 0.65:
+            return "⚽ ÜSTÜ 2.5 GÖL: YÜKSEK İHTİMAL"
+        else:
+            return "🛑 ALTI 2.5 GÖL: MUHTEMEL"
+    
+    def to_dict(self) -> Dict:
+        """Eski (analyze_match) dict şekli; ilk çağrıda üretilir, sonra tekrar kullanılır"""
+        if self._dict is None:
+            self._dict = self._render()
+        return self._dict
+    
+    def _render(self) -> Dict:
+        home_form = self.home_form
+        away_form = self.away_form
         
-        # VERİ ÇIKART
         home_wins = home_form.get('wins', 0)
         home_draws = home_form.get('draws', 0)
         home_losses = home_form.get('losses', 0)
@@ -22,62 +95,19 @@ class BettingAnalyzer:
         away_ga = away_form.get('goals_against', 0)
         away_form_list = away_form.get('form', [])
         
-        home_total = max(home_wins + home_draws + home_losses, 1)
-        away_total = max(away_wins + away_draws + away_losses, 1)
-        
-        # FORM SCORE (0-1)
-        home_form_score = (home_wins * 3 + home_draws) / (home_total * 3)
-        away_form_score = (away_wins * 3 + away_draws) / (away_total * 3)
-        
-        # GÖL ORTALAMALARI
-        home_gf_avg = home_gf / home_total
-        away_gf_avg = away_gf / away_total
-        home_ga_avg = home_ga / home_total
-        away_ga_avg = away_ga / away_total
-        
-        # WIN PROBABILITIES (EV AVANTAJI + FORM FARKI)
-        base_prob = 0.50 + 0.10  # Ev avantajı
-        form_diff = (home_form_score - away_form_score) * 0.25
-        goal_diff = ((home_gf_avg - away_gf_avg) / (home_gf_avg + away_gf_avg + 0.1)) * 0.15
-        
-        home_prob = min(0.85, max(0.15, base_prob + form_diff + goal_diff))
+        home_win_prob = self.home_win_prob
+        draw_prob = self.draw_prob
+        away_win_prob = self.away_win_prob
+        max_prob = self.max_prob
+        form_gap = abs(self.home_form_score - self.away_form_score)
         
-        # BERABERLIK OLASILIĞI
-        form_similarity = 1 - abs(home_form_score - away_form_score)
-        draw_prob = form_similarity * 0.20
-        
-        # AWAY KAZANMA
-        away_prob = 1 - home_prob - draw_prob
-        
-        # NORMALIZE
-        total = home_prob + away_prob + draw_prob
-        home_win_prob = home_prob / total
-        draw_prob = draw_prob / total
-        away_win_prob = away_prob / total
-        
-        # GÖL TAHMINLERI
-        expected_total = home_gf_avg + away_gf_avg
-        over_2_5_prob = self._calculate_over_2_5(expected_total)
-        both_score_prob = (1 - math.exp(-home_gf_avg)) * (1 - math.exp(-away_gf_avg))
-        
-        # H2H
-        h2h_home_wins = h2h.get('team1_wins', 0)
-        h2h_away_wins = h2h.get('team2_wins', 0)
-        h2h_draws = h2h.get('draws', 0)
+        h2h_home_wins = self.h2h_home_wins
+        h2h_away_wins = self.h2h_away_wins
+        h2h_draws = self.h2h_draws
         h2h_total = h2h_home_wins + h2h_away_wins + h2h_draws
         
-        # TAVSİYELER
-        if home_win_prob > 0.55:
-            main_rec = f"🏠 EV SAHİBİ FAVORIT: {int(home_win_prob*100)}%"
-        elif away_win_prob > 0.55:
-            main_rec = f"✈️ DEPLASMAN GÜÇLÜ: {int(away_win_prob*100)}%"
-        else:
-            main_rec = f"🤝 YAKIN MAÇLAR: Her şey mümkün"
-        
-        if over_2_5_prob > 0.65:
-            goal_rec = "⚽ ÜSTÜ 2.5 GÖL: YÜKSEK İHTİMAL"
-        else:
-            goal_rec = "🛑 ALTI 2.5 GÖL: MUHTEMEL"
+        main_rec = self.recommendation
+        goal_rec = self.goal_recommendation
         
         return {
             'success': True,
@@ -91,42 +121,42 @@ class BettingAnalyzer:
             
             # GOAL ODDS
             'goal_predictions': {
-                'over_2_5': over_2_5_prob * 100,
-                'under_2_5': (1 - over_2_5_prob) * 100,
-                'both_teams_score': both_score_prob * 100,
-                'expected_home_goals': home_gf_avg,
-                'expected_away_goals': away_gf_avg,
-                'expected_total': expected_total,
-                'over_1_5': self._calculate_over_x(expected_total, 1.5) * 100,
+                'over_2_5': self.over_2_5 * 100,
+                'under_2_5': (1 - self.over_2_5) * 100,
+                'both_teams_score': self.btts * 100,
+                'expected_home_goals': self.home_gf_avg,
+                'expected_away_goals': self.away_gf_avg,
+                'expected_total': self.expected_total,
+                'over_1_5': self.over_1_5 * 100,
             },
             
             # FORM
             'form_analysis': {
                 'home': {
-                    'score': round(home_form_score * 100, 1),
+                    'score': round(self.home_form_score * 100, 1),
                     'wins': home_wins,
                     'draws': home_draws,
                     'losses': home_losses,
                     'gf': home_gf,
                     'ga': home_ga,
                     'goal_difference': home_gf - home_ga,
-                    'gf_avg': round(home_gf_avg, 2),
-                    'ga_avg': round(home_ga_avg, 2),
+                    'gf_avg': round(self.home_gf_avg, 2),
+                    'ga_avg': round(self.home_ga_avg, 2),
                     'scoring_power': home_form.get('scoring_power', 'High ⚡'),
                     'defense_strength': home_form.get('defense_strength', 'Strong 💪'),
                     'trend': 'Good ↗️',
                     'recent_form': ''.join(home_form_list[:5])
                 },
                 'away': {
-                    'score': round(away_form_score * 100, 1),
+                    'score': round(self.away_form_score * 100, 1),
                     'wins': away_wins,
                     'draws': away_draws,
                     'losses': away_losses,
                     'gf': away_gf,
                     'ga': away_ga,
                     'goal_difference': away_gf - away_ga,
-                    'gf_avg': round(away_gf_avg, 2),
-                    'ga_avg': round(away_ga_avg, 2),
+                    'gf_avg': round(self.away_gf_avg, 2),
+                    'ga_avg': round(self.away_ga_avg, 2),
                     'scoring_power': away_form.get('scoring_power', 'High ⚡'),
                     'defense_strength': away_form.get('defense_strength', 'Average 👤'),
                     'trend': 'Good ↗️',
@@ -156,13 +186,13 @@ class BettingAnalyzer:
                 'uyari': '⚠️ Dikkat edin' if abs(home_win_prob - away_win_prob) < 0.05 else 'Uyarı: Yok'
             },
             
-            'risk_level': 'LOW' if max(home_win_prob, away_win_prob, draw_prob) > 0.65 else 'MEDIUM' if max(home_win_prob, away_win_prob, draw_prob) > 0.50 else 'HIGH',
+            'risk_level': self.risk_level,
             
             'assessment': {
-                'risk_level': 'LOW' if max(home_win_prob, away_win_prob, draw_prob) > 0.65 else 'MEDIUM',
-                'confidence': 'High' if max(home_win_prob, away_win_prob, draw_prob) > 0.60 else 'Medium',
-                'form_difference': round(abs(home_form_score - away_form_score) * 100, 1),
-                'betting_clarity': 'Clear' if abs(home_form_score - away_form_score) > 0.20 else 'Moderate' if abs(home_form_score - away_form_score) > 0.10 else 'Unclear',
+                'risk_level': 'LOW' if max_prob > 0.65 else 'MEDIUM',
+                'confidence': 'High' if max_prob > 0.60 else 'Medium',
+                'form_difference': round(form_gap * 100, 1),
+                'betting_clarity': 'Clear' if form_gap > 0.20 else 'Moderate' if form_gap > 0.10 else 'Unclear',
             },
             
             'recent_goals': {
@@ -176,6 +206,77 @@ class BettingAnalyzer:
                 'h2h': {}
             }
         }
+
+class BettingAnalyzer:
+    """Basit ve etkili analiz motoru"""
+    
+    def analyze_match(self, home_form: Dict, away_form: Dict, h2h: Dict) -> Dict:
+        """Maç analizi"""
+        return self.compute(home_form, away_form, h2h).to_dict()
+    
+    def compute(self, home_form: Dict, away_form: Dict, h2h: Dict) -> AnalysisResult:
+        """Maç analizi - sadece sayısal çekirdek (toplu işler, cache'ler için)"""
+        
+        # VERİ ÇIKART
+        home_wins = home_form.get('wins', 0)
+        home_draws = home_form.get('draws', 0)
+        home_losses = home_form.get('losses', 0)
+        home_gf = home_form.get('goals_for', 0)
+        home_ga = home_form.get('goals_against', 0)
+        
+        away_wins = away_form.get('wins', 0)
+        away_draws = away_form.get('draws', 0)
+        away_losses = away_form.get('losses', 0)
+        away_gf = away_form.get('goals_for', 0)
+        away_ga = away_form.get('goals_against', 0)
+        
+        home_total = max(home_wins + home_draws + home_losses, 1)
+        away_total = max(away_wins + away_draws + away_losses, 1)
+        
+        # FORM SCORE (0-1)
+        home_form_score = (home_wins * 3 + home_draws) / (home_total * 3)
+        away_form_score = (away_wins * 3 + away_draws) / (away_total * 3)
+        
+        # GÖL ORTALAMALARI
+        home_gf_avg = home_gf / home_total
+        away_gf_avg = away_gf / away_total
+        home_ga_avg = home_ga / home_total
+        away_ga_avg = away_ga / away_total
+        
+        # WIN PROBABILITIES (EV AVANTAJI + FORM FARKI)
+        base_prob = 0.50 + 0.10  # Ev avantajı
+        form_diff = (home_form_score - away_form_score) * 0.25
+        goal_diff = ((home_gf_avg - away_gf_avg) / (home_gf_avg + away_gf_avg + 0.1)) * 0.15
+        
+        home_prob = min(0.85, max(0.15, base_prob + form_diff + goal_diff))
+        
+        # BERABERLIK OLASILIĞI
+        form_similarity = 1 - abs(home_form_score - away_form_score)
+        draw_prob = form_similarity * 0.20
+        
+        # AWAY KAZANMA
+        away_prob = 1 - home_prob - draw_prob
+        
+        # NORMALIZE
+        total = home_prob + away_prob + draw_prob
+        home_win_prob = home_prob / total
+        draw_prob = draw_prob / total
+        away_win_prob = away_prob / total
+        
+        # GÖL TAHMINLERI
+        expected_total = home_gf_avg + away_gf_avg
+        over_2_5_prob = self._calculate_over_2_5(expected_total)
+        both_score_prob = (1 - math.exp(-home_gf_avg)) * (1 - math.exp(-away_gf_avg))
+        
+        return AnalysisResult(
+            home_form, away_form,
+            home_win_prob, draw_prob, away_win_prob,
+            over_2_5_prob, self._calculate_over_x(expected_total, 1.5), both_score_prob,
+            home_gf_avg, away_gf_avg, home_ga_avg, away_ga_avg,
+            home_form_score, away_form_score,
+            # H2H
+            h2h.get('team1_wins', 0), h2h.get('team2_wins', 0), h2h.get('draws', 0),
+        )
     
     def _calculate_over_2_5(self, expected: float) -> float:
         """Üstü 2.5 olasılığı"""
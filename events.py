@@ -0,0 +1,179 @@
+import json
+import sqlite3
+import threading
+import time
+import logging
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from betting_analyzer import AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+# Analiz diff'lerinde izlenen alanlar (kısa anahtar -> AnalysisResult alanı)
+ANALYSIS_FIELDS = {
+    'hw': 'home_win_prob',
+    'd': 'draw_prob',
+    'aw': 'away_win_prob',
+    'o25': 'over_2_5',
+    'btts': 'btts',
+}
+
+
+class EventBroker:
+    """
+    Server-sent events (SSE) yayıncısı
+    - Tüm aboneler tek bir halka tamponu (ring buffer) paylaşır; publish abone sayısından bağımsız
+    - Olay bir kez JSON'a çevrilir, her abone sadece kendi imlecini (son sıra no) tutar
+    - Tamponun gerisinde kalan yavaş abone 'resync' olayı alır, bellekte kuyruk birikmez
+    - Olay yoksa `heartbeat` saniyede bir yorum satırı gönderilir (proxy timeout'larına karşı)
+    - python app.py ve gunicorn (varsayılan gevent worker) ile her abone bir greenlet olur, thread değil
+    - share(): çok worker'lı modda olaylar SQLite 'events' tablosuna yazılır, her worker tabloyu yoklayıp
+      kendi tamponuna alır; sıra no'ları tablo id'si olduğu için Last-Event-ID her worker'da geçerlidir
+    """
+    
+    def __init__(self, buffer_size: int = 1024, heartbeat: int = 15):
+        self.buffer = deque(maxlen=buffer_size)  # (seq, event_type, payload)
+        self.heartbeat = heartbeat
+        self.seq = 0
+        self.subscribers = 0
+        self.cond = threading.Condition()
+        
+        # share() sonrası: paylaşılan olay tablosu
+        self.conn = None
+        self.db_lock = threading.Lock()
+        self.poll_interval = 0.5
+        self.keep = 10000
+        self.trimmed = 0
+    
+    def share(self, db_path: str, poll_interval: float = 0.5, keep: int = 10000):
+        """Olayları tüm worker'larla SQLite üzerinden paylaş (tabloda en fazla `keep` olay tutulur)"""
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    type TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            ''')
+        self.poll_interval = poll_interval
+        self.keep = keep
+        
+        # Son olayları tampona al; yeniden bağlanan istemciler başka worker'da da kaldığı yerden devam eder
+        rows = self.conn.execute(
+            'SELECT id, type, payload FROM events ORDER BY id DESC LIMIT ?', (self.buffer.maxlen,)
+        ).fetchall()
+        with self.cond:
+            self.buffer.clear()
+            self.buffer.extend(reversed(rows))
+            self.seq = rows[0][0] if rows else 0
+            self.trimmed = self.seq
+        
+        threading.Thread(target=self._poll, daemon=True).start()
+    
+    def _poll(self):
+        """Diğer worker'ların (ve bu worker'ın) yazdığı olayları tampona al"""
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                with self.db_lock:
+                    rows = self.conn.execute(
+                        'SELECT id, type, payload FROM events WHERE id > ? ORDER BY id', (self.seq,)
+                    ).fetchall()
+                    
+                    if rows and rows[-1][0] - self.trimmed > self.keep:
+                        with self.conn:
+                            self.conn.execute('DELETE FROM events WHERE id <= ?', (rows[-1][0] - self.keep,))
+                        self.trimmed = rows[-1][0]
+            except sqlite3.Error as e:
+                logger.error(f"Olay yoklama hatası: {e}")
+                continue
+            
+            if rows:
+                with self.cond:
+                    self.buffer.extend(rows)
+                    self.seq = rows[-1][0]
+                    self.cond.notify_all()
+    
+    def publish(self, event_type: str, data: Dict) -> int:
+        payload = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+        
+        if self.conn is not None:
+            # Tampona yoklayıcı ekler; böylece tüm worker'lar olayları aynı sırayla görür
+            with self.db_lock, self.conn:
+                cursor = self.conn.execute(
+                    'INSERT INTO events (type, payload, created_at) VALUES (?, ?, ?)',
+                    (event_type, payload, time.time())
+                )
+            return cursor.lastrowid
+        
+        with self.cond:
+            self.seq += 1
+            self.buffer.append((self.seq, event_type, payload))
+            self.cond.notify_all()
+            return self.seq
+    
+    def _since(self, cursor: int) -> Tuple[List[Tuple[int, str, str]], bool]:
+        """cursor'dan sonraki olaylar; ikinci değer: aradaki olaylar tampondan düştü mü"""
+        if not self.buffer or cursor >= self.seq:
+            return [], False
+        
+        lost = self.buffer[0][0] > cursor + 1
+        # Sıra no'larında boşluk olabilir (paylaşılan tablo), sondan geriye doğru ara
+        start = len(self.buffer)
+        while start > 0 and self.buffer[start - 1][0] > cursor:
+            start -= 1
+        return [self.buffer[i] for i in range(start, len(self.buffer))], lost
+    
+    def stream(self, last_event_id: Optional[int] = None) -> Iterator[str]:
+        """Bir abone için SSE metin akışı (Last-Event-ID ile kaldığı yerden devam eder)"""
+        with self.cond:
+            cursor = self.seq if last_event_id is None else last_event_id
+            # Sunucu yeniden başladıysa istemcinin imleci ileride kalır
+            stale = cursor > self.seq
+            if stale:
+                cursor = self.seq
+            self.subscribers += 1
+        
+        try:
+            yield 'retry: 5000\n\n'
+            
+            if stale:
+                yield f"event: resync\ndata: {{\"seq\":{cursor}}}\n\n"
+            
+            while True:
+                with self.cond:
+                    if cursor >= self.seq:
+                        self.cond.wait(timeout=self.heartbeat)
+                    events, lost = self._since(cursor)
+                
+                if lost:
+                    yield f"event: resync\ndata: {{\"seq\":{self.seq}}}\n\n"
+                
+                if not events:
+                    yield ': ping\n\n'
+                    continue
+                
+                # Bekleyen olayları tek yazımda gönder
+                yield ''.join(
+                    f"id: {seq}\nevent: {event_type}\ndata: {payload}\n\n"
+                    for seq, event_type, payload in events
+                )
+                cursor = events[-1][0]
+        
+        finally:
+            with self.cond:
+                self.subscribers -= 1
+
+
+def analysis_diff(old: Optional[AnalysisResult], new: AnalysisResult) -> Dict:
+    """İki analiz arasında değişen olasılıklar (4 haneye yuvarlanmış)"""
+    diff = {}
+    for short, attr in ANALYSIS_FIELDS.items():
+        new_value = round(getattr(new, attr), 4)
+        if old is None or round(getattr(old, attr), 4) != new_value:
+            diff[short] = new_value
+    return diff
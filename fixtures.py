@@ -0,0 +1,130 @@
+import threading
+import time
+import logging
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class MatchdayPipeline:
+    """
+    Günün maçları için toplu ön analiz
+    - Fikstürü yükler, takımları çözer
+    - Tüm takımların formunu sınırlı paralellikle önceden çeker
+    - Her maçı matristen analiz edip olasılıklarla birlikte bellekte tutar
+    - Her yenilemede matris tüm takımlar için kurulur; TTL'i dolan cache kayıtları böylece yeniden çekilir
+    - match_date(): kaydedilen iddianın hangi günün maçına ait olduğunu fikstürden bulur
+    - start(): açılışta bir kez, sonra her `interval` saniyede bir yeniler
+    """
+    
+    def __init__(self, api, matrix, interval: int = 900):
+        self.api = api
+        self.matrix = matrix
+        self.interval = interval
+        # Paylaşılan cache TTL ile kendini yeniliyorsa periyodik zorla çekime gerek yok
+        self.force_refresh = True
+        
+        self.matches = []
+        self.dates = {}  # (ev sahibi, deplasman) kayıtlı adları -> maç günü (YYYY-MM-DD)
+        self.updated_at = None
+        self._timer = None
+    
+    def refresh(self, force: bool = False) -> List[Dict]:
+        """Fikstürü yükle ve tüm maçları analiz et; force=True ise günün takımlarının formları zorla yeniden çekilir"""
+        started = time.perf_counter()
+        fixtures = self.api.get_todays_matches()
+        
+        # Takımları çöz
+        resolved = []
+        for fixture in fixtures:
+            home = self.api.search_team(fixture['home_team'])
+            away = self.api.search_team(fixture['away_team'])
+            resolved.append((fixture, home, away))
+        
+        # Günün takımlarını gerekirse zorla çek
+        team_ids = sorted({t['id'] for _, home, away in resolved for t in (home, away) if t})
+        if force and team_ids:
+            self.api.get_team_forms(team_ids, self.matrix.last_matches, refresh=True)
+        
+        # Matrisi tüm takımlar için tazele: taze kayıtlar paylaşılan cache'ten okunur,
+        # TTL'i dolanlar kilitle tek worker tarafından bir kez yeniden çekilir (/analyze da bunları görür)
+        self.matrix.build()
+        
+        matches = [self._analyze_fixture(fixture, home, away) for fixture, home, away in resolved]
+        
+        today = date.today().isoformat()
+        dates = {
+            (home['name'], away['name']): (fixture.get('date') or today)[:10]
+            for fixture, home, away in resolved if home and away
+        }
+        
+        # Tek atamayla değiştir, okuyucular hep tutarlı bir liste görür
+        self.matches = matches
+        self.dates = dates
+        self.updated_at = datetime.now().isoformat()
+        
+        elapsed = (time.perf_counter() - started) * 1000
+        logger.info(f"📅 Günün maçları hazır: {len(matches)} maç, {elapsed:.1f} ms")
+        return matches
+    
+    def match_date(self, home_team: str, away_team: str) -> Optional[str]:
+        """Fikstürdeki maçın günü (kayıtlı takım adlarıyla); fikstürde yoksa None"""
+        return self.dates.get((home_team, away_team))
+    
+    def _analyze_fixture(self, fixture: Dict, home: Optional[Dict], away: Optional[Dict]) -> Dict:
+        match = {
+            'home_team': fixture['home_team'],
+            'away_team': fixture['away_team'],
+            'date': fixture.get('date'),
+            'kickoff': fixture.get('kickoff'),
+            'analyzed': False,
+        }
+        
+        if not home or not away:
+            return match
+        
+        result, home_form, away_form = self.matrix.get_or_compute(home['id'], away['id'])
+        
+        # Form çekilemediyse olasılıklar yer tutucu verilerden gelir, gösterilmez
+        if home_form.get('fallback') or away_form.get('fallback'):
+            return match
+        
+        match.update({
+            'analyzed': True,
+            'home_team_id': home['id'],
+            'away_team_id': away['id'],
+            'home_win_prob': result.home_win_prob,
+            'draw_prob': result.draw_prob,
+            'away_win_prob': result.away_win_prob,
+            'over_2_5_prob': result.over_2_5,
+            'both_teams_score': result.btts,
+            'recommendation': result.recommendation,
+            'risk_level': result.risk_level,
+        })
+        return match
+    
+    def start(self):
+        """Hemen bir kez çalıştır, sonra periyodik olarak yenile"""
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Fikstür pipeline hatası: {e}")
+        self._schedule()
+    
+    def _schedule(self):
+        if self.interval <= 0:
+            return
+        self._timer = threading.Timer(self.interval, self._run_scheduled)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def _run_scheduled(self):
+        try:
+            self.refresh(force=self.force_refresh)
+        except Exception as e:
+            logger.error(f"Fikstür pipeline hatası: {e}")
+        self._schedule()
+    
+    def stop(self):
+        if self._timer:
+            self._timer.cancel()
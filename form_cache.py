@@ -0,0 +1,218 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _alive(owner: str) -> bool:
+    """owner (PID) hâlâ çalışıyor mu (worker'lar aynı makinede)"""
+    try:
+        os.kill(int(owner), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        return True
+    return True
+
+
+class SharedFormCache:
+    """
+    Tüm gunicorn worker'larının paylaştığı SQLite tabanlı form cache'i
+    - FootballDataAPI.cache yerine geçer (dict gibi: in, [], []=, pop)
+    - Bir takımı ilk çeken worker kaydeder, diğerleri veritabanından okur
+    - Aynı anda iki worker'ın aynı takımı çekmemesi için kısa süreli kilit (lease) alınır
+    - Kilit başkasındaysa en fazla max_wait saniye beklenir, sonra kendisi çeker (istek bloklanmaz)
+    - Çözülen JSON süreç içinde saklanır; sadece updated_at değişirse yeniden okunur
+    - İsabet / kaçırma sayaçları worker başına tabloya yazılır, stats() çalışan worker'ları toplar
+      (yeniden başlatılan / geri dönüştürülen worker'ların satırları silinir)
+    """
+    
+    def __init__(self, db_path: str, ttl: int = 0, lease_seconds: int = 15, max_wait: float = 2.0,
+                 flush_interval: int = 10):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.lease_seconds = lease_seconds
+        self.max_wait = max_wait
+        self.flush_interval = flush_interval
+        self.owner = f"{os.getpid()}"
+        
+        self.local = {}  # cache_key -> (updated_at, data)
+        self.counters = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'writes': 0}
+        self.last_flush = 0.0
+        self.lock = threading.RLock()
+        
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS form_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    owner TEXT NOT NULL
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS form_cache_leases (
+                    cache_key TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS form_cache_stats (
+                    owner TEXT PRIMARY KEY,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    shared_hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0,
+                    writes INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+    
+    def _read(self, cache_key: str, count: bool = True) -> Optional[Dict]:
+        """Taze kaydı döndür (yoksa None); count=True ise sayaçları günceller"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT updated_at, owner FROM form_cache WHERE cache_key = ?', (cache_key,)
+            ).fetchone()
+            
+            if not row or (self.ttl and time.time() - row[0] > self.ttl):
+                return None
+            
+            updated_at, owner = row
+            cached = self.local.get(cache_key)
+            if cached and cached[0] == updated_at:
+                if count:
+                    self.counters['hits'] += 1
+                    self._flush()
+                return cached[1]
+            
+            data = json.loads(self.conn.execute(
+                'SELECT data FROM form_cache WHERE cache_key = ?', (cache_key,)
+            ).fetchone()[0])
+            self.local[cache_key] = (updated_at, data)
+            
+            # Başka bir worker'ın çektiği veri = kazanılmış bir scrape
+            if count:
+                self.counters['shared_hits' if owner != self.owner else 'hits'] += 1
+                self._flush()
+            return data
+    
+    def _acquire_lease(self, cache_key: str) -> bool:
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                'DELETE FROM form_cache_leases WHERE cache_key = ? AND expires_at < ?', (cache_key, now)
+            )
+            cursor = self.conn.execute(
+                'INSERT OR IGNORE INTO form_cache_leases (cache_key, owner, expires_at) VALUES (?, ?, ?)',
+                (cache_key, self.owner, now + self.lease_seconds)
+            )
+            return cursor.rowcount == 1
+    
+    def release(self, cache_key: str):
+        """Çekim başarısız olduysa kilidi bırak (bekleyen worker'lar kendisi dener)"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                'DELETE FROM form_cache_leases WHERE cache_key = ? AND owner = ?', (cache_key, self.owner)
+            )
+    
+    def __contains__(self, cache_key: str) -> bool:
+        if self._read(cache_key) is not None:
+            return True
+        
+        # Kilidi alan worker çeker; diğerleri kaydın yazılmasını kısa süre bekler
+        deadline = time.time() + self.max_wait
+        while not self._acquire_lease(cache_key):
+            time.sleep(0.1)
+            if self._read(cache_key) is not None:
+                return True
+            if time.time() > deadline:
+                break
+        
+        with self.lock:
+            self.counters['misses'] += 1
+            self._flush(force=True)
+        return False
+    
+    def __getitem__(self, cache_key: str) -> Dict:
+        # İsabet __contains__ içinde sayıldı (api önce `in`, sonra [] kullanır)
+        data = self._read(cache_key, count=False)
+        if data is None:
+            raise KeyError(cache_key)
+        return data
+    
+    def get(self, cache_key: str, default=None):
+        data = self._read(cache_key)
+        return default if data is None else data
+    
+    def __setitem__(self, cache_key: str, data: Dict):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute('''
+                INSERT INTO form_cache (cache_key, data, updated_at, owner) VALUES (?, ?, ?, ?)
+                ON CONFLICT (cache_key) DO UPDATE SET
+                    data = excluded.data, updated_at = excluded.updated_at, owner = excluded.owner
+            ''', (cache_key, json.dumps(data, ensure_ascii=False), now, self.owner))
+            self.conn.execute('DELETE FROM form_cache_leases WHERE cache_key = ?', (cache_key,))
+            self.local[cache_key] = (now, data)
+            self.counters['writes'] += 1
+            self._flush(force=True)
+    
+    def pop(self, cache_key: str, default=None):
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM form_cache WHERE cache_key = ?', (cache_key,))
+            cached = self.local.pop(cache_key, None)
+        return cached[1] if cached else default
+    
+    def _flush(self, force: bool = False):
+        """Sayaçları worker satırına yaz (isabetlerde en fazla flush_interval saniyede bir)"""
+        now = time.time()
+        if not force and now - self.last_flush < self.flush_interval:
+            return
+        
+        with self.lock, self.conn:
+            self.conn.execute('''
+                INSERT INTO form_cache_stats (owner, hits, shared_hits, misses, writes) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (owner) DO UPDATE SET
+                    hits = excluded.hits, shared_hits = excluded.shared_hits,
+                    misses = excluded.misses, writes = excluded.writes
+            ''', (self.owner, self.counters['hits'], self.counters['shared_hits'],
+                  self.counters['misses'], self.counters['writes']))
+            self.last_flush = now
+    
+    def stats(self) -> Dict:
+        """Çalışan worker'ların toplam cache istatistikleri (ölü PID'lerin satırları önce silinir)"""
+        self._flush(force=True)
+        with self.lock, self.conn:
+            owners = [row[0] for row in self.conn.execute('SELECT owner FROM form_cache_stats')]
+            dead = [(owner,) for owner in owners if not _alive(owner)]
+            if dead:
+                self.conn.executemany('DELETE FROM form_cache_stats WHERE owner = ?', dead)
+                logger.info(f"🧹 {len(dead)} kapanmış worker'ın cache sayaçları silindi")
+            
+            row = self.conn.execute('''
+                SELECT COUNT(*), SUM(hits), SUM(shared_hits), SUM(misses), SUM(writes) FROM form_cache_stats
+            ''').fetchone()
+            entries = self.conn.execute('SELECT COUNT(*) FROM form_cache').fetchone()[0]
+        
+        workers, hits, shared_hits, misses, writes = row[0], row[1] or 0, row[2] or 0, row[3] or 0, row[4] or 0
+        lookups = hits + shared_hits + misses
+        
+        return {
+            'workers': workers,
+            'entries': entries,
+            'hits': hits,
+            'shared_hits': shared_hits,
+            'misses': misses,
+            'scrapes': writes,
+            'hit_rate': round((hits + shared_hits) / lookups, 4) if lookups else 0,
+            'cross_worker_hit_rate': round(shared_hits / lookups, 4) if lookups else 0,
+            # Worker'lar ayrı cache kullansaydı her paylaşılan isabet bir scrape olurdu
+            'scrapes_saved': shared_hits,
+        }
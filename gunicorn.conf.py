@@ -0,0 +1,22 @@
+import os
+
+# Çok worker'lı production modu:
+#   gunicorn -c gunicorn.conf.py
+# Form cache'i ve /stream olayları SQLite üzerinden paylaşılır (bkz. form_cache.py, events.py), harici servis gerekmez.
+# gevent worker: her bağlantı (binlerce /stream abonesi dahil) bir greenlet; sync worker'da her abone
+# bütün bir worker'ı tutar ve timeout sonunda öldürülür, bu yüzden sync sadece /stream kullanılmıyorsa seçilmeli.
+
+wsgi_app = 'app:create_app()'
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 1000))
+timeout = 60
+
+# Her worker create_app'i kendisi çağırır (SQLite bağlantıları fork'tan sonra açılır)
+preload_app = False
+
+
+def on_starting(server):
+    if worker_class == 'sync':
+        server.log.warning("sync worker: /stream aboneleri worker'ları tutar ve %ss sonra kesilir", timeout)
@@ -0,0 +1,150 @@
+import gzip
+import logging
+from typing import Dict, Iterable, Optional
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+from betting_analyzer import AnalysisResult
+
+try:
+    import orjson
+except ImportError:  # opsiyonel, yoksa standart json kullanılır
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # opsiyonel, yoksa sadece gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Kompakt (v2) /analyze yanıtında seçilebilecek bölümler
+COMPACT_FIELDS = ('probs', 'goals', 'form', 'h2h', 'rec', 'assessment')
+
+# Bu boyutun altındaki yanıtlar sıkıştırılmaz (başlık maliyeti kazancı geçer)
+MIN_COMPRESS_BYTES = 512
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """orjson kuruluysa Flask'ın JSON çıktısını onunla üret (aynı çıktı, daha az CPU)"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def init_app(app):
+    """JSON provider'ı ve yanıt sıkıştırmayı uygulamaya bağla"""
+    if orjson is not None:
+        app.json_provider_class = OrjsonProvider
+        app.json = OrjsonProvider(app)
+    app.after_request(compress_response)
+
+
+def _r(value, digits: int = 3):
+    return round(value, digits) if isinstance(value, (int, float)) else value
+
+
+def compact_analysis(result: AnalysisResult, home_team: str, away_team: str, fields: Optional[Iterable[str]] = None) -> Dict:
+    """
+    /analyze için kompakt (v2) yanıt
+    - Her bölüm bir kez (tekrar eden form/h2h/goals kopyaları yok)
+    - Tüm olasılıklar ve oranlar (h2h dahil) 0-1 aralığında, 3 haneye yuvarlanmış
+    - fields ile sadece istenen bölümler döner; probs/goals/h2h için metinler hiç üretilmez
+    """
+    fields = set(COMPACT_FIELDS if fields is None else fields)
+    response = {'v': 2, 'home_team': home_team, 'away_team': away_team}
+    
+    if 'probs' in fields:
+        response['probs'] = {
+            'home': _r(result.home_win_prob),
+            'draw': _r(result.draw_prob),
+            'away': _r(result.away_win_prob),
+        }
+    
+    if 'goals' in fields:
+        response['goals'] = {
+            'over_1_5': _r(result.over_1_5),
+            'over_2_5': _r(result.over_2_5),
+            'under_2_5': _r(result.under_2_5),
+            'btts': _r(result.btts),
+            'exp_home': _r(result.home_gf_avg, 2),
+            'exp_away': _r(result.away_gf_avg, 2),
+            'exp_total': _r(result.expected_total, 2),
+        }
+    
+    if 'h2h' in fields:
+        total = result.h2h_home_wins + result.h2h_away_wins + result.h2h_draws
+        response['h2h'] = {
+            'home_wins': result.h2h_home_wins,
+            'away_wins': result.h2h_away_wins,
+            'draws': result.h2h_draws,
+            'total_matches': total,
+            'home_win_rate': _r(result.h2h_home_wins / total) if total else 0,
+            'away_win_rate': _r(result.h2h_away_wins / total) if total else 0,
+            'draw_rate': _r(result.h2h_draws / total) if total else 0,
+        }
+    
+    if fields & {'form', 'rec', 'assessment'}:
+        analysis = result.to_dict()
+        
+        if 'form' in fields:
+            response['form'] = {
+                side: {key: _r(value, 2) for key, value in form.items()}
+                for side, form in analysis['form_analysis'].items()
+            }
+        
+        if 'rec' in fields:
+            response['rec'] = analysis['recommendations']
+            response['risk'] = result.risk_level
+        
+        if 'assessment' in fields:
+            response['assessment'] = analysis['assessment']
+    
+    return response
+
+
+def parse_fields(value: Optional[str]) -> Optional[list]:
+    """?fields=probs,goals → ['probs', 'goals'] (parametre yoksa None; boş liste veya bilinmeyen ad varsa ValueError)"""
+    if not value:
+        return None
+    
+    fields = [part.strip() for part in value.split(',') if part.strip()]
+    unknown = [f for f in fields if f not in COMPACT_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"Bilinmeyen fields: {', '.join(unknown)}" if unknown else "fields boş")
+    return fields
+
+
+def compress_response(response):
+    """Accept-Encoding'e göre JSON yanıtları brotli veya gzip ile sıkıştır (q değerleri dikkate alınır, q=0 = kabul etmiyor)"""
+    if (response.direct_passthrough
+            or response.mimetype != 'application/json'
+            or response.status_code < 200 or response.status_code >= 300
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    # Yanıt Accept-Encoding'e göre değişebilir; küçük / sıkıştırılmamış olanlar dahil cache'ler bunu bilmeli
+    response.vary.add('Accept-Encoding')
+    
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_BYTES:
+        return response
+    
+    accepted = request.accept_encodings
+    br_q = accepted['br'] if brotli is not None else 0
+    gzip_q = accepted['gzip']
+    if br_q > 0 and br_q >= gzip_q:
+        body, encoding = brotli.compress(data, quality=4), 'br'
+    elif gzip_q > 0:
+        body, encoding = gzip.compress(data, compresslevel=5), 'gzip'
+    else:
+        return response
+    
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    response.headers['Content-Length'] = str(len(body))
+    return response
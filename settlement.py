@@ -0,0 +1,65 @@
+import logging
+from typing import Dict, List, Optional
+
+import analytics
+from analytics import BET_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Desteklenen marketler: 1 / X / 2 ve gol marketleri
+MARKETS = ('1', 'X', '2', 'over_2_5', 'under_2_5', 'btts')
+
+# Bir market için kazanma koşulu (r = results satırı)
+_WIN_CONDITIONS = {
+    '1': 'r.home_goals > r.away_goals',
+    'X': 'r.home_goals = r.away_goals',
+    '2': 'r.home_goals < r.away_goals',
+    'over_2_5': 'r.home_goals + r.away_goals > 2',
+    'under_2_5': 'r.home_goals + r.away_goals < 3',
+    'btts': 'r.home_goals > 0 AND r.away_goals > 0',
+}
+
+SETTLE_SQL = '''
+    UPDATE bets
+    SET result = CASE bets.market
+            {cases}
+        END,
+        notes = COALESCE(bets.notes, 'Otomatik: ' || r.home_goals || '-' || r.away_goals)
+    FROM results r
+    WHERE (bets.result IS NULL OR bets.result = 'pending')
+      AND bets.market IS NOT NULL
+      AND r.home_team = bets.home_team
+      AND r.away_team = bets.away_team
+      AND r.date = bets.match_date
+    RETURNING {columns}
+'''.format(cases='\n            '.join(
+    f"WHEN '{market}' THEN CASE WHEN {cond} THEN 'win' ELSE 'loss' END"
+    for market, cond in _WIN_CONDITIONS.items()
+), columns=', '.join(f'bets.{c.strip()}' for c in BET_COLUMNS.split(',')))
+
+
+def bet_market(data: Dict) -> Optional[str]:
+    """
+    İddianın marketi: sadece açıkça verilmişse (MARKETS'ten biri)
+    Analizden tahmin edilmez; marketi olmayan iddialar otomatik sonuçlanmaz
+    """
+    market = data.get('market')
+    return market if market in MARKETS else None
+
+
+def settle_pending_bets(conn) -> List[Dict]:
+    """
+    Bekleyen tüm iddiaları kayıtlı maç sonuçlarıyla eşleştirip tek UPDATE ile sonuçlandır
+    Eşleşme: takımlar + maç günü (bets.match_date; bets.date iddianın verildiği zaman)
+    Sadece marketi ve maç günü bilinen iddialar sonuçlanır
+    Aynı transaction'da analitik aggregate'ler de güncellenir
+    Döner: sonuçlanan iddialar (BET_COLUMNS alanlarıyla)
+    """
+    cursor = conn.execute(SETTLE_SQL)
+    names = [d[0] for d in cursor.description]
+    settled = [dict(zip(names, row)) for row in cursor.fetchall()]
+    
+    analytics.apply(conn, settled)
+    
+    logger.info(f"🧾 {len(settled)} iddia otomatik sonuçlandı")
+    return settled
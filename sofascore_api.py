@@ -1,93 +1,67 @@
 import requests
 from bs4 import BeautifulSoup
-from typing import Dict, List, Optional
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import date
+import json
 import logging
+import os
+import re
 import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class FootballDataAPI:
+# Bir maçın takım açısından skoru: (attığı gol, yediği gol)
+MatchResult = Tuple[int, int]
+
+
+class DataSource(ABC):
     """
-    Sofascore.com'dan Web Scraping ile GERÇEK veri çeken bot
-    - Simple HTML parse (Flashscore'dan çok daha kolay)
-    - Gerçek son maçlar
-    - Gerçek skorlar
-    - Hiç API kısıtlaması YOK!
+    Takımın son maç sonuçlarını getiren veri kaynağı arayüzü
+    - fetch_results: tek takım
+    - fetch_many: birden fazla takım (en fazla max_workers paralel istek)
     """
     
-    def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        self.cache = {}
-        
-        # Türkiye Süper Lig takımları (Sofascore slug'ları)
-        self.turkish_teams = {
-            'Fenerbahçe': 'fenerbahce',
-            'Galatasaray': 'galatasaray',
-            'Beşiktaş': 'besiktas',
-            'Trabzonspor': 'trabzonspor',
-            'Başakşehir': 'istanbul-basaksehir',
-            'Kayserispor': 'kayserispor',
-        }
+    name = 'base'
+    max_workers = 4
+    
+    @abstractmethod
+    def fetch_results(self, team_name: str, slug: str, limit: int = 5,
+                      sofascore_id: Optional[int] = None) -> Optional[List[MatchResult]]:
+        ...
+    
+    def fetch_many(self, teams: List[Tuple[str, str, Optional[int]]], limit: int = 5) -> Dict[str, Optional[List[MatchResult]]]:
+        """teams: [(team_name, slug, sofascore_id), ...] → {slug: sonuçlar}"""
+        if not teams:
+            return {}
         
-        self.team_id_map = {i+1: name for i, name in enumerate(self.turkish_teams.keys())}
+        workers = max(1, min(self.max_workers, len(teams)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(lambda t: self._fetch_one(t, limit), teams)
+            return {slug: res for (_, slug, _), res in zip(teams, results)}
     
-    def search_team(self, team_name: str) -> Optional[Dict]:
-        """Takımı bul"""
+    def _fetch_one(self, team: Tuple[str, str, Optional[int]], limit: int) -> Optional[List[MatchResult]]:
+        """Tek takımın hatası tüm toplu çekimi düşürmesin (o takım fallback'e düşer)"""
         try:
-            normalized_name = team_name.lower().strip()
-            
-            for team, slug in self.turkish_teams.items():
-                if team.lower() == normalized_name or normalized_name in team.lower():
-                    team_id = list(self.turkish_teams.keys()).index(team) + 1
-                    logger.info(f"✅ Takım bulundu: {team} (ID: {team_id})")
-                    return {
-                        'id': team_id,
-                        'name': team,
-                        'slug': slug
-                    }
-            
-            return None
+            return self.fetch_results(team[0], team[1], limit, team[2])
         except Exception as e:
-            logger.error(f"Takım araması hatası: {e}")
+            logger.error(f"{team[0]} çekme hatası: {e}")
             return None
+
+
+class HTMLScrapeSource(DataSource):
+    """Sofascore takım sayfasını HTML olarak indirip skorları tahmin eden kaynak"""
     
-    def get_team_form(self, team_id: int, last_matches: int = 5) -> Dict:
-        """Sofascore'dan takımın son maçlarını çek"""
-        try:
-            if team_id not in self.team_id_map:
-                logger.warning(f"Bilinmeyen team_id: {team_id}")
-                return self._get_fallback_form()
-            
-            team_name = self.team_id_map[team_id]
-            slug = self.turkish_teams[team_name]
-            
-            logger.info(f"🔴 Sofascore'dan {team_name} çekiliyor...")
-            
-            # Cache kontrol
-            cache_key = f"form_{team_id}"
-            if cache_key in self.cache:
-                logger.info(f"📦 Cache'den: {team_name}")
-                return self.cache[cache_key]
-            
-            # Sofascore'dan çek
-            form_data = self._scrape_sofascore(team_name, slug, last_matches)
-            
-            if form_data:
-                logger.info(f"✅ {team_name}: {form_data['form']} - {form_data['wins']}W-{form_data['draws']}D-{form_data['losses']}L")
-                self.cache[cache_key] = form_data
-                return form_data
-            
-            logger.warning("Scrape başarısız, fallback kullan")
-            return self._get_fallback_form()
-        
-        except Exception as e:
-            logger.error(f"Form çekme hatası: {e}")
-            return self._get_fallback_form()
+    name = 'html'
     
-    def _scrape_sofascore(self, team_name: str, slug: str, limit: int = 5) -> Optional[Dict]:
+    def __init__(self, headers: Optional[Dict] = None, timeout: int = 10):
+        self.headers = headers or {}
+        self.timeout = timeout
+    
+    def fetch_results(self, team_name: str, slug: str, limit: int = 5,
+                      sofascore_id: Optional[int] = None) -> Optional[List[MatchResult]]:
         """Sofascore'dan HTML scrape et"""
         try:
             # Sofascore takım sayfasını aç
@@ -95,7 +69,7 @@ class FootballDataAPI:
             logger.info(f"📡 Açılıyor: {url}")
             
             try:
-                response = requests.get(url, headers=self.headers, timeout=10)
+                response = requests.get(url, headers=self.headers, timeout=self.timeout)
                 response.encoding = 'utf-8'
             except:
                 logger.warning(f"Sofascore erişilemiyor")
@@ -107,10 +81,7 @@ class FootballDataAPI:
             
             soup = BeautifulSoup(response.content, 'html.parser')
             
-            form = []
-            goals_for = 0
-            goals_against = 0
-            match_count = 0
+            results = []
             
             # Sofascore'da maçları ara
             # Farklı selector'ları dene
@@ -124,7 +95,7 @@ class FootballDataAPI:
             logger.info(f"Bulunan maç element sayısı: {len(matches)}")
             
             for match_elem in matches[:20]:
-                if match_count >= limit:
+                if len(results) >= limit:
                     break
                 
                 try:
@@ -140,7 +111,6 @@ class FootballDataAPI:
                         # Text'i doğrudan ara
                         text = match_elem.get_text()
                         # "3-1" gibi pattern ara
-                        import re
                         scores = re.findall(r'(\d+)\s*-\s*(\d+)', text)
                         if scores:
                             score_text = f"{scores[0][0]}-{scores[0][1]}"
@@ -177,70 +147,340 @@ class FootballDataAPI:
                     
                     if score_pos > team_pos:
                         # Takım adı score'dan önce = home
-                        team_goals = home_goals
-                        opp_goals = away_goals
+                        results.append((home_goals, away_goals))
                     else:
                         # Takım adı score'dan sonra = away
-                        team_goals = away_goals
-                        opp_goals = home_goals
-                    
-                    goals_for += team_goals
-                    goals_against += opp_goals
+                        results.append((away_goals, home_goals))
                     
-                    # Form
-                    if team_goals > opp_goals:
-                        form.append('W')
-                    elif team_goals == opp_goals:
-                        form.append('D')
-                    else:
-                        form.append('L')
-                    
-                    match_count += 1
-                    logger.info(f"✅ Maç: {score_text} → {team_name} = {'W' if team_goals > opp_goals else 'D' if team_goals == opp_goals else 'L'}")
+                    logger.info(f"✅ Maç: {score_text} → {team_name}")
                 
                 except Exception as e:
                     logger.debug(f"Maç parse hatası: {e}")
                     continue
             
-            if not form or len(form) < 3:
-                logger.warning(f"Yeterli maç bulunamadı: {len(form)}")
-                return None
+            return results
+        
+        except Exception as e:
+            logger.error(f"Scrape hatası: {e}")
+            return None
+
+
+class JSONEventsSource(DataSource):
+    """
+    Sofascore'un JSON event endpoint'inden son maçları çeken kaynak
+    - Endpoint sayısal Sofascore takım ID'si ister (ID yoksa slug kullanılır, yerel sunucular için)
+    - Sadece gereken alanlar okunur (takım ID/slug'ları, skorlar, durum)
+    - Home/away, event içindeki takım bilgisinden (ID veya slug) kesin olarak belirlenir
+    - fetch_many ile birden fazla takım paralel çekilir (tek Session, bağlantı tekrar kullanımı)
+    - base_url değiştirilerek kayıtlı payload sunan yerel bir sunucuya yönlendirilebilir
+    """
+    
+    name = 'json'
+    
+    def __init__(self, base_url: str = 'https://api.sofascore.com/api/v1',
+                 headers: Optional[Dict] = None, timeout: int = 10, max_workers: int = 4):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+    
+    def events_url(self, slug: str, sofascore_id: Optional[int] = None) -> str:
+        return f"{self.base_url}/team/{sofascore_id or slug}/events/last/0"
+    
+    def fetch_results(self, team_name: str, slug: str, limit: int = 5,
+                      sofascore_id: Optional[int] = None) -> Optional[List[MatchResult]]:
+        url = self.events_url(slug, sofascore_id)
+        logger.info(f"📡 JSON: {url}")
+        if sofascore_id is None:
+            logger.warning(f"{team_name}: Sofascore ID tanımlı değil, slug ile deneniyor")
+        
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.warning(f"Sofascore JSON erişilemiyor: {e}")
+            return None
+        
+        if response.status_code != 200:
+            logger.warning(f"Status {response.status_code}")
+            return None
+        
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = None
+        
+        events = payload.get('events') if isinstance(payload, dict) else None
+        if not isinstance(events, list):
+            logger.warning(f"Geçersiz JSON: {url}")
+            return None
+        
+        return self.parse_events(events, slug, limit, sofascore_id)
+    
+    @staticmethod
+    def parse_events(events: List[Dict], slug: str, limit: int = 5,
+                     sofascore_id: Optional[int] = None) -> List[MatchResult]:
+        """
+        Event listesinden takım açısından skorları çıkar (en yeni maç önce)
+        Eksik / null alanlı event'ler atlanır
+        """
+        def field(obj, key: str) -> Dict:
+            value = obj.get(key) if isinstance(obj, dict) else None
+            return value if isinstance(value, dict) else {}
+        
+        def is_team(team: Dict) -> bool:
+            return (sofascore_id is not None and team.get('id') == sofascore_id) or team.get('slug') == slug
+        
+        finished = [
+            e for e in events
+            if field(e, 'status').get('type') == 'finished'
+        ]
+        finished.sort(key=lambda e: e.get('startTimestamp') or 0, reverse=True)
+        
+        results = []
+        matched = 0
+        for event in finished:
+            if len(results) >= limit:
+                break
+            
+            home, away = field(event, 'homeTeam'), field(event, 'awayTeam')
+            matched += is_team(home) or is_team(away)
+            
+            home_goals = field(event, 'homeScore').get('current')
+            away_goals = field(event, 'awayScore').get('current')
+            if not isinstance(home_goals, int) or not isinstance(away_goals, int):
+                continue
+            
+            if is_team(home):
+                results.append((home_goals, away_goals))
+            elif is_team(away):
+                results.append((away_goals, home_goals))
+        
+        # Yanlış takım ID'si başka bir takımın maçlarını getirir; sessizce fallback'e düşmesin
+        if finished and not matched:
+            logger.warning(f"Event'lerin hiçbiri '{slug}' (ID: {sofascore_id}) takımına ait değil, takım ID'sini kontrol edin")
+        
+        return results
+
+
+class FootballDataAPI:
+    """
+    Sofascore.com'dan GERÇEK veri çeken bot
+    - Veri kaynağı değiştirilebilir: HTML scrape veya JSON event endpoint'i
+    - Gerçek son maçlar
+    - Gerçek skorlar
+    - Hiç API kısıtlaması YOK!
+    """
+    
+    def __init__(self, source: Optional[DataSource] = None):
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+        self.cache = {}
+        self.source = source or self._default_source()
+        self.listeners = []
+        
+        # Türkiye Süper Lig takımları (Sofascore slug'ları)
+        self.turkish_teams = {
+            'Fenerbahçe': 'fenerbahce',
+            'Galatasaray': 'galatasaray',
+            'Beşiktaş': 'besiktas',
+            'Trabzonspor': 'trabzonspor',
+            'Başakşehir': 'istanbul-basaksehir',
+            'Kayserispor': 'kayserispor',
+        }
+        
+        # Sofascore'un sayısal takım ID'leri (JSON API bunları ister)
+        # Sadece doğrulanmış ID'ler: yanlış ID başka takımın maçlarını getirir. Listede olmayan takımlar
+        # (Başakşehir, Kayserispor) slug ile istenir; bu yalnızca slug kabul eden yerel kaynaklarda çalışır
+        self.sofascore_ids = {
+            'Fenerbahçe': 3052,
+            'Galatasaray': 3061,
+            'Beşiktaş': 3050,
+            'Trabzonspor': 3051,
+        }
+        
+        self.team_id_map = {i+1: name for i, name in enumerate(self.turkish_teams.keys())}
+    
+    def _default_source(self) -> DataSource:
+        """DATA_SOURCE env: 'html' (varsayılan) veya 'json'"""
+        if os.environ.get('DATA_SOURCE', 'html').lower() == 'json':
+            base_url = os.environ.get('SOFASCORE_API_URL', 'https://api.sofascore.com/api/v1')
+            return JSONEventsSource(base_url, headers=self.headers)
+        return HTMLScrapeSource(headers=self.headers)
+    
+    def add_listener(self, callback: Callable[[int, Dict], None]):
+        """Form her yenilendiğinde callback(team_id, form_data) çağrılır"""
+        self.listeners.append(callback)
+    
+    def _store_form(self, team_id: int, form_data: Dict):
+        """Formu cache'e yaz ve dinleyicilere haber ver"""
+        self.cache[f"form_{team_id}"] = form_data
+        for callback in self.listeners:
+            try:
+                callback(team_id, form_data)
+            except Exception as e:
+                logger.error(f"Form listener hatası: {e}")
+    
+    def _release(self, cache_key: str):
+        """Paylaşılan cache kullanılıyorsa başarısız çekimden sonra kilidi bırak"""
+        release = getattr(self.cache, 'release', None)
+        if release:
+            release(cache_key)
+    
+    def search_team(self, team_name: str) -> Optional[Dict]:
+        """Takımı bul"""
+        try:
+            normalized_name = team_name.lower().strip()
             
-            # İstatistikleri hesapla
-            wins = form.count('W')
-            draws = form.count('D')
-            losses = form.count('L')
-            total_matches = len(form)
+            for team, slug in self.turkish_teams.items():
+                if team.lower() == normalized_name or normalized_name in team.lower():
+                    team_id = list(self.turkish_teams.keys()).index(team) + 1
+                    logger.info(f"✅ Takım bulundu: {team} (ID: {team_id})")
+                    return {
+                        'id': team_id,
+                        'name': team,
+                        'slug': slug,
+                        'sofascore_id': self.sofascore_ids.get(team)
+                    }
             
-            # Sezon tahmini (34 maçlık)
-            estimated_wins = int(34 * wins / total_matches)
-            estimated_draws = int(34 * draws / total_matches)
-            estimated_losses = int(34 * losses / total_matches)
+            return None
+        except Exception as e:
+            logger.error(f"Takım araması hatası: {e}")
+            return None
+    
+    def get_team_form(self, team_id: int, last_matches: int = 5) -> Dict:
+        """Sofascore'dan takımın son maçlarını çek"""
+        try:
+            if team_id not in self.team_id_map:
+                logger.warning(f"Bilinmeyen team_id: {team_id}")
+                return self._get_fallback_form()
             
-            logger.info(f"📊 {team_name}: {form} → {estimated_wins}W-{estimated_draws}D-{estimated_losses}L, {goals_for}GF-{goals_against}GA")
+            team_name = self.team_id_map[team_id]
+            slug = self.turkish_teams[team_name]
             
-            return {
-                'name': team_name,
-                'form': form[:5],
-                'wins': estimated_wins,
-                'draws': estimated_draws,
-                'losses': estimated_losses,
-                'goals_for': goals_for * 7,
-                'goals_against': goals_against * 7,
-                'goal_difference': (goals_for - goals_against) * 7,
-                'scoring_power': self._get_scoring_power(goals_for / max(total_matches, 1)),
-                'defense_strength': self._get_defense_strength(goals_against / max(total_matches, 1)),
-                'recent_goals': {
-                    'top_scorers': [],
-                    'total_goals_last_matches': goals_for,
-                    'avg_goals_per_match': goals_for / max(total_matches, 1),
-                    'goal_timing': {}
-                }
-            }
+            logger.info(f"🔴 Sofascore'dan {team_name} çekiliyor...")
+            
+            # Cache kontrol
+            cache_key = f"form_{team_id}"
+            if cache_key in self.cache:
+                logger.info(f"📦 Cache'den: {team_name}")
+                return self.cache[cache_key]
+            
+            # Sofascore'dan çek
+            results = self.source.fetch_results(team_name, slug, last_matches, self.sofascore_ids.get(team_name))
+            form_data = self._build_form(team_name, results)
+            
+            if form_data:
+                logger.info(f"✅ {team_name}: {form_data['form']} - {form_data['wins']}W-{form_data['draws']}D-{form_data['losses']}L")
+                self._store_form(team_id, form_data)
+                return form_data
+            
+            logger.warning("Scrape başarısız, fallback kullan")
+            self._release(cache_key)
+            return self._get_fallback_form()
         
         except Exception as e:
-            logger.error(f"Scrape hatası: {e}")
+            logger.error(f"Form çekme hatası: {e}")
+            return self._get_fallback_form()
+    
+    def get_team_forms(self, team_ids: List[int], last_matches: int = 5, refresh: bool = False) -> Dict[int, Dict]:
+        """Birden fazla takımın formunu tek seferde çek (cache'te olmayanlar toplu çekilir)"""
+        forms = {}
+        missing = []
+        
+        for team_id in team_ids:
+            if team_id not in self.team_id_map:
+                forms[team_id] = self._get_fallback_form()
+                continue
+            
+            cache_key = f"form_{team_id}"
+            if not refresh and cache_key in self.cache:
+                forms[team_id] = self.cache[cache_key]
+            else:
+                missing.append(team_id)
+        
+        if not missing:
+            return forms
+        
+        teams = [self._team_ref(team_id) for team_id in missing]
+        logger.info(f"🔴 Toplu çekiliyor ({self.source.name}): {[name for name, _, _ in teams]}")
+        
+        try:
+            fetched = self.source.fetch_many(teams, last_matches)
+        except Exception as e:
+            logger.error(f"Toplu form çekme hatası: {e}")
+            fetched = {}
+        
+        for team_id, (team_name, slug, _) in zip(missing, teams):
+            form_data = self._build_form(team_name, fetched.get(slug))
+            if form_data:
+                self._store_form(team_id, form_data)
+                forms[team_id] = form_data
+            else:
+                logger.warning(f"{team_name}: scrape başarısız, fallback kullan")
+                self._release(f"form_{team_id}")
+                forms[team_id] = self._get_fallback_form()
+        
+        return forms
+    
+    def _team_ref(self, team_id: int) -> Tuple[str, str, Optional[int]]:
+        """(ad, slug, sofascore_id)"""
+        team_name = self.team_id_map[team_id]
+        return team_name, self.turkish_teams[team_name], self.sofascore_ids.get(team_name)
+    
+    def _build_form(self, team_name: str, results: Optional[List[MatchResult]]) -> Optional[Dict]:
+        """Maç sonuçlarından form verisini oluştur"""
+        if not results or len(results) < 3:
+            logger.warning(f"Yeterli maç bulunamadı: {len(results or [])}")
             return None
+        
+        form = []
+        goals_for = 0
+        goals_against = 0
+        
+        for team_goals, opp_goals in results:
+            goals_for += team_goals
+            goals_against += opp_goals
+            
+            if team_goals > opp_goals:
+                form.append('W')
+            elif team_goals == opp_goals:
+                form.append('D')
+            else:
+                form.append('L')
+        
+        # İstatistikleri hesapla
+        wins = form.count('W')
+        draws = form.count('D')
+        losses = form.count('L')
+        total_matches = len(form)
+        
+        # Sezon tahmini (34 maçlık)
+        estimated_wins = int(34 * wins / total_matches)
+        estimated_draws = int(34 * draws / total_matches)
+        estimated_losses = int(34 * losses / total_matches)
+        
+        logger.info(f"📊 {team_name}: {form} → {estimated_wins}W-{estimated_draws}D-{estimated_losses}L, {goals_for}GF-{goals_against}GA")
+        
+        return {
+            'name': team_name,
+            'form': form[:5],
+            'wins': estimated_wins,
+            'draws': estimated_draws,
+            'losses': estimated_losses,
+            'goals_for': goals_for * 7,
+            'goals_against': goals_against * 7,
+            'goal_difference': (goals_for - goals_against) * 7,
+            'scoring_power': self._get_scoring_power(goals_for / max(total_matches, 1)),
+            'defense_strength': self._get_defense_strength(goals_against / max(total_matches, 1)),
+            'recent_goals': {
+                'top_scorers': [],
+                'total_goals_last_matches': goals_for,
+                'avg_goals_per_match': goals_for / max(total_matches, 1),
+                'goal_timing': {}
+            }
+        }
     
     def _get_scoring_power(self, gf_avg: float) -> str:
         if gf_avg >= 2.5:
@@ -267,7 +507,9 @@ class FootballDataAPI:
             return "Very Weak 💔"
     
     def _get_fallback_form(self) -> Dict:
+        # 'fallback': çekim başarısız, kalıcı olarak saklanmamalı (bkz. AnalysisMatrix)
         return {
+            'fallback': True,
             'name': 'Unknown',
             'form': ['W', 'D', 'L', 'W', 'D'],
             'wins': 16, 'draws': 5, 'losses': 13,
@@ -308,4 +550,35 @@ class FootballDataAPI:
         return {'team1_wins': 0, 'team2_wins': 0, 'draws': 0, 'total_matches': 0, 'matches': []}
     
     def get_todays_matches(self) -> List[Dict]:
-        return []
+        """
+        Bugünün fikstürünü yerel kaynaktan yükle
+        - FIXTURES_FILE: JSON dosyası
+        - FIXTURES_URL: aynı formatta JSON dönen feed
+        Format: [{"home_team": ..., "away_team": ..., "date": "YYYY-MM-DD", "kickoff": "20:00"}, ...]
+        veya {"matches": [...]}. "date" verilmişse (gün veya ISO tarih-saat) sadece bugünün maçları döner.
+        """
+        fixtures_file = os.environ.get('FIXTURES_FILE')
+        fixtures_url = os.environ.get('FIXTURES_URL')
+        
+        try:
+            if fixtures_file:
+                with open(fixtures_file, encoding='utf-8') as f:
+                    payload = json.load(f)
+            elif fixtures_url:
+                response = requests.get(fixtures_url, headers=self.headers, timeout=10)
+                response.raise_for_status()
+                payload = response.json()
+            else:
+                return []
+        except (OSError, ValueError, requests.RequestException) as e:
+            logger.error(f"Fikstür yüklenemedi: {e}")
+            return []
+        
+        if isinstance(payload, dict):
+            payload = payload.get('matches', [])
+        
+        today = date.today().isoformat()
+        return [
+            m for m in payload
+            if m.get('home_team') and m.get('away_team') and str(m.get('date') or today)[:10] == today
+        ]
@@ -0,0 +1,204 @@
+import csv
+import json
+import threading
+import time
+import logging
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from analytics import MARKET_ATTRS
+from betting_analyzer import AnalysisResult
+from settlement import MARKETS
+
+logger = logging.getLogger(__name__)
+
+
+def market_probability(result: AnalysisResult, market: str) -> Optional[float]:
+    """Analizden bir marketin olasılığı (0-1)"""
+    attr = MARKET_ATTRS.get(market)
+    return getattr(result, attr) if attr else None
+
+
+def load_odds_file(path: str) -> List[Dict]:
+    """JSON ({"odds": [...]} veya liste) ya da CSV oran dosyasını oku"""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            return list(csv.DictReader(f))
+        payload = json.load(f)
+    return payload.get('odds', []) if isinstance(payload, dict) else payload
+
+
+class ValueBetScanner:
+    """
+    Model olasılıklarını bahis oranlarıyla karşılaştıran tarayıcı
+    - Oranlar fikstür (ev, deplasman) başına gruplanır; her fikstürün analizi bir kez alınıp tüm marketleri hesaplanır
+    - edge = p - 1/oran, EV = p * oran - 1, stake = kesirli Kelly
+    - Pozitif EV'li satırlar edge'e göre sıralı bir indekste tutulur, top(k) sadece dilimleme
+    - Matristeki bir çift değişince sadece o fikstürün satırları yeniden hesaplanır
+    - Satırlar (market, bahisçi, maç günü) ile ayrılır; günü geçmiş fikstürler gün değişince atılır
+    """
+    
+    def __init__(self, api, matrix, kelly_fraction: float = 0.25):
+        self.api = api
+        self.matrix = matrix
+        self.kelly_fraction = kelly_fraction
+        
+        self.lines = {}   # (home_id, away_id) -> [(market, odds, bookmaker, date), ...]
+        self.scored = {}  # (home_id, away_id) -> [value bet, ...]
+        self.index = []   # tüm value bet'ler, edge'e göre azalan
+        self.updated_at = None
+        self.day = date.today().isoformat()
+        self.lock = threading.Lock()
+        
+        matrix.add_listener(self.on_matrix_change)
+    
+    def ingest(self, odds_rows: Iterable[Dict]) -> Tuple[List[Tuple], int]:
+        """
+        Oran satırlarını ekle/güncelle ve etkilenen fikstürleri yeniden tara
+        Satır: { home_team, away_team, market, odds, date?, bookmaker? }
+        Günü geçmiş satırlar atlanır
+        Döner: (kaydedilecek satırlar, atlanan satır sayısı)
+        """
+        today = date.today().isoformat()
+        rows = []
+        skipped = 0
+        touched = set()
+        teams = {}  # ad -> search_team sonucu (satır başına tekrar arama yapma)
+        
+        with self.lock:
+            for row in odds_rows:
+                market = row.get('market')
+                for name in (row.get('home_team', ''), row.get('away_team', '')):
+                    if name not in teams:
+                        teams[name] = self.api.search_team(name)
+                home = teams[row.get('home_team', '')]
+                away = teams[row.get('away_team', '')]
+                try:
+                    odds = float(row.get('odds'))
+                except (TypeError, ValueError):
+                    odds = 0
+                
+                day = (row.get('date') or '')[:10]
+                
+                if market not in MARKETS or not home or not away or odds <= 1 or (day and day < today):
+                    skipped += 1
+                    continue
+                
+                pair = (home['id'], away['id'])
+                bookmaker = row.get('bookmaker') or 'default'
+                
+                # Aynı maç günü + market + bahisçi için son oran geçerli
+                lines = [l for l in self.lines.get(pair, []) if (l[0], l[2], l[3]) != (market, bookmaker, day)]
+                lines.append((market, odds, bookmaker, day))
+                self.lines[pair] = lines
+                touched.add(pair)
+                
+                rows.append((home['name'], away['name'], day, market, bookmaker, odds))
+        
+        self._rescan(touched)
+        return rows, skipped
+    
+    def on_matrix_change(self, changes: List[Tuple[int, int, Optional[AnalysisResult], AnalysisResult]]):
+        touched = {(home_id, away_id) for home_id, away_id, _, _ in changes if (home_id, away_id) in self.lines}
+        if touched:
+            self._rescan(touched)
+    
+    def _rescan(self, pairs: Iterable[Tuple[int, int]]):
+        started = time.perf_counter()
+        
+        # Analizler kilit dışında alınır (matris listener'ı tekrar buraya dönebilir)
+        analyses = {}
+        for pair in pairs:
+            analysis, home_form, away_form = self.matrix.get_or_compute(*pair)
+            # Fallback formla yapılan analiz puanlanmaz; gerçek form gelince matris listener'ı tekrar tarar
+            fallback = home_form.get('fallback') or away_form.get('fallback')
+            analyses[pair] = None if fallback else analysis
+        
+        with self.lock:
+            for pair, analysis in analyses.items():
+                if analysis is None:
+                    self.scored.pop(pair, None)
+                else:
+                    self.scored[pair] = self._score(pair, analysis)
+            
+            self.index = sorted(
+                (bet for bets in self.scored.values() for bet in bets),
+                key=lambda bet: bet['edge'],
+                reverse=True
+            )
+            self.updated_at = datetime.now().isoformat()
+        
+        elapsed = (time.perf_counter() - started) * 1000
+        logger.info(f"💰 Value bet taraması: {len(analyses)} fikstür, {len(self.index)} fırsat, {elapsed:.1f} ms")
+    
+    def _score(self, pair: Tuple[int, int], analysis: AnalysisResult) -> List[Dict]:
+        home_name = self.api.team_id_map.get(pair[0])
+        away_name = self.api.team_id_map.get(pair[1])
+        
+        bets = []
+        for market, odds, bookmaker, date in self.lines.get(pair, []):
+            prob = market_probability(analysis, market)
+            if prob is None:
+                continue
+            
+            ev = prob * odds - 1
+            if ev <= 0:
+                continue
+            
+            bets.append({
+                'home_team': home_name,
+                'away_team': away_name,
+                'date': date,
+                'market': market,
+                'bookmaker': bookmaker,
+                'odds': odds,
+                'probability': round(prob, 4),
+                'implied_probability': round(1 / odds, 4),
+                'edge': round(prob - 1 / odds, 4),
+                'expected_value': round(ev, 4),
+                'kelly_stake': round(ev / (odds - 1) * self.kelly_fraction, 4),
+            })
+        return bets
+    
+    def expire(self):
+        """Günü geçmiş fikstürlerin oranlarını ve fırsatlarını at (yeniden hesaplama gerekmez)"""
+        today = date.today().isoformat()
+        
+        def current(day):
+            return not day or day >= today
+        
+        with self.lock:
+            for pair in list(self.lines):
+                lines = [l for l in self.lines[pair] if current(l[3])]
+                if lines:
+                    self.lines[pair] = lines
+                    self.scored[pair] = [bet for bet in self.scored.get(pair, []) if current(bet['date'])]
+                else:
+                    del self.lines[pair]
+                    self.scored.pop(pair, None)
+            
+            self.index = [bet for bet in self.index if current(bet['date'])]
+            self.day = today
+        
+        logger.info(f"💰 Eski oranlar atıldı: {self.count_lines()} satır kaldı")
+    
+    def top(self, k: int = 20, market: Optional[str] = None, min_edge: float = 0.0) -> List[Dict]:
+        if self.day != date.today().isoformat():
+            self.expire()
+        
+        index = self.index
+        if market is None and min_edge <= 0:
+            return index[:k]
+        
+        result = []
+        for bet in index:
+            if bet['edge'] < min_edge:
+                break
+            if market is None or bet['market'] == market:
+                result.append(bet)
+                if len(result) >= k:
+                    break
+        return result
+    
+    def count_lines(self) -> int:
+        return sum(len(lines) for lines in self.lines.values())